@@ -0,0 +1,13 @@
+import json
+import os
+import threading
+
+
+def atomic_write_json(path, obj):
+    """Write `obj` as JSON to a temp file and swap it in, so concurrent readers never see a partial file."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    # Unique per process and thread, so concurrent writers of the same path do not share a temp file
+    temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as file:
+        json.dump(obj, file)
+    os.replace(temp_path, path)
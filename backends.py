@@ -0,0 +1,102 @@
+"""Where get_json's upstream calls go.
+
+CFBD_BACKEND picks one:
+    live    (default) the CFBD API, or any server that speaks it at CFBD_BASE_URL,
+            e.g. a local fixture_server.py
+    replay  recorded responses from the CFBD_FIXTURES directory, with no network at all
+
+With the live backend, set CFBD_RECORD=DIR to save every fetched response in DIR as a fixture.
+A fixture is one JSON file per request, in the same format as the response cache, so a
+response cache directory can be replayed as is.
+"""
+import json
+import os
+import requests
+from requests.adapters import HTTPAdapter
+import metrics
+from atomic_files import atomic_write_json
+from response_cache import cache_key, envelope
+
+BASE_URL = os.environ.get('CFBD_BASE_URL', 'https://api.collegefootballdata.com')
+# (connect, read) timeout in seconds for every upstream call
+TIMEOUT = (5, 30)
+
+
+def fixture_path(directory, endpoint, params=None):
+    return os.path.join(directory, f'{cache_key(endpoint, params)}.json')
+
+
+def load_fixture(directory, endpoint, params=None):
+    """The recorded payload for a request, or None if there is no fixture for it."""
+    try:
+        with open(fixture_path(directory, endpoint, params), 'r', encoding='utf-8') as file:
+            return json.load(file)['payload']
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def save_fixture(directory, endpoint, params, payload):
+    atomic_write_json(fixture_path(directory, endpoint, params), envelope(endpoint, params, payload))
+
+
+class LiveBackend:
+    """The CFBD API (or a stand-in at `base_url`) over one shared keep-alive session."""
+
+    def __init__(self, base_url=BASE_URL):
+        from config_api import headers
+
+        self.base_url = base_url
+        # One keep-alive connection pool per process, shared by every page and every session,
+        # so a rerun reuses open TLS connections instead of handshaking on each call
+        self.session = requests.Session()
+        self.session.headers.update(headers)
+        self.session.headers['Accept-Encoding'] = 'gzip, deflate'
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=32)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def get(self, endpoint, params=None):
+        response = self.session.get(f'{self.base_url}{endpoint}', params=params, timeout=TIMEOUT)
+        response.raise_for_status()
+        # Bytes on the wire (compressed) when the server says, else the decoded body
+        metrics.count_bytes(endpoint, int(response.headers.get('Content-Length') or len(response.content)))
+        return response.json()
+
+
+class ReplayBackend:
+    """Recorded fixtures only; a request without a fixture fails like a 404 from the API."""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def get(self, endpoint, params=None):
+        payload = load_fixture(self.directory, endpoint, params)
+        if payload is None:
+            raise requests.exceptions.HTTPError(f'404: no fixture for {endpoint} {params or {}} in {self.directory}')
+        return payload
+
+
+class RecordingBackend:
+    """Pass requests through to `backend` and save each response as a fixture."""
+
+    def __init__(self, backend, directory):
+        self.backend = backend
+        self.directory = directory
+
+    def get(self, endpoint, params=None):
+        payload = self.backend.get(endpoint, params)
+        save_fixture(self.directory, endpoint, params, payload)
+        return payload
+
+
+def create_backend():
+    """Build the backend selected by CFBD_BACKEND / CFBD_FIXTURES / CFBD_RECORD."""
+    kind = os.environ.get('CFBD_BACKEND', 'live')
+    if kind == 'replay':
+        return ReplayBackend(os.environ.get('CFBD_FIXTURES', 'fixtures'))
+    if kind != 'live':
+        raise ValueError(f"Unknown CFBD_BACKEND {kind!r}; expected 'live' or 'replay'")
+    backend = LiveBackend()
+    if os.environ.get('CFBD_RECORD'):
+        backend = RecordingBackend(backend, os.environ['CFBD_RECORD'])
+    return backend
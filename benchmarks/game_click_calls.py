@@ -0,0 +1,121 @@
+"""Count upstream calls made by team_results.py per rerun and per game selection.
+
+Runs the page headlessly with streamlit.testing against canned responses (no API key or network
+needed) and reports upstream calls for the cold load, for a game selection, for a full rerun, and
+for the same rerun with the loaded season and response cache thrown away (the old behaviour).
+A game-row click reruns only the display_results fragment. streamlit.testing can neither click a
+row nor run a fragment on its own, so the selection is measured as the fragment's work: looking
+up each game's box score in the season the page kept in session state.
+
+Usage:
+    python benchmarks/game_click_calls.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.chdir(ROOT)
+# Start from an empty response cache so the cold load is really cold
+os.environ['CFBD_CACHE_DIR'] = tempfile.mkdtemp()
+
+import requests
+from streamlit.testing.v1 import AppTest
+import response_cache
+from box_scores import get_box_score
+from player_stats_benchmark import synthetic_season
+
+GAMES = 13
+
+
+class FakeResponse:
+    headers = {}
+
+    def __init__(self, payload):
+        self.payload = payload
+        self.content = b''
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+
+def canned_payload(endpoint, params):
+    team = params.get('team', 'Georgia Tech')
+    if endpoint == '/games':
+        return [{'id': game_id, 'week': game_id + 1, 'startDate': '2024-09-07T16:00:00.000Z',
+                 'homeTeam': team, 'homePoints': 28, 'homeLineScores': [7, 7, 7, 7],
+                 'awayTeam': 'Away State', 'awayPoints': 21, 'awayLineScores': [7, 7, 0, 7], 'attendance': 40000}
+                for game_id in range(GAMES)]
+    if endpoint == '/games/players':
+        return synthetic_season(GAMES)
+    if endpoint == '/games/teams':
+        return [{'id': game_id, 'teams': [
+            {'teamId': 59, 'team': team, 'conference': 'ACC', 'homeAway': 'home', 'points': 28,
+             'stats': [{'category': 'totalYards', 'stat': '400'}]},
+            {'teamId': 1, 'team': 'Away State', 'conference': 'ACC', 'homeAway': 'away', 'points': 21,
+             'stats': [{'category': 'totalYards', 'stat': '350'}]}]}
+            for game_id in range(GAMES)]
+    if endpoint == '/coaches':
+        return [{'id': 1, 'firstName': 'Brent', 'lastName': 'Key', 'hireDate': None, 'seasons': []}]
+    if endpoint == '/records':
+        return [{'team': team, 'conference': 'ACC',
+                 'total': {'games': GAMES, 'wins': 7, 'losses': 6},
+                 'conferenceGames': {'games': 8, 'wins': 5, 'losses': 3},
+                 'homeGames': {'games': 7, 'wins': 5, 'losses': 2},
+                 'awayGames': {'games': 6, 'wins': 2, 'losses': 4}}]
+    return []
+
+
+def main():
+    # Patch at the class level so the shared session in cfbd_client picks it up when the page imports it
+    sent = []
+
+    def fake_get(self, url, params=None, **kwargs):
+        endpoint = url.split('collegefootballdata.com', 1)[1]
+        sent.append(endpoint)
+        return FakeResponse(canned_payload(endpoint, params or {}))
+
+    requests.Session.get = fake_get
+
+    def calls_for(run):
+        before = len(sent)
+        run()
+        return len(sent) - before
+
+    at = AppTest.from_file(os.path.join(ROOT, 'team_results.py'), default_timeout=60)
+    at.secrets['cfbd_api_key'] = 'benchmark'
+
+    def old_click():
+        # Without the kept season (and without any caching) every rerun refetched everything
+        del at.session_state['season']
+        response_cache.CACHE_DIR = tempfile.mkdtemp()
+        sys.modules['season_records']._seasons.clear()
+        at.run()
+
+    def select_games():
+        # What the fragment does for a clicked row, for every game of the season
+        season = at.session_state['season']
+        for game_id in season['games_df']['id']:
+            get_box_score(season['box_score_index'], game_id, season['key'][1])
+
+    cold = calls_for(at.run)
+    start = time.perf_counter()
+    selection = calls_for(select_games)
+    per_game = (time.perf_counter() - start) / GAMES
+    rerun = calls_for(at.run)
+    old = calls_for(old_click)
+    assert not at.exception, at.exception
+    print(f'cold load:                         {cold} upstream calls')
+    print(f'game selection (fragment):         {selection} upstream calls, {per_game * 1000:.1f} ms per game')
+    print(f'full rerun:                        {rerun} upstream calls')
+    print(f'same rerun, season not kept (old): {old} upstream calls')
+
+
+if __name__ == '__main__':
+    main()
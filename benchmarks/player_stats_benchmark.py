@@ -0,0 +1,112 @@
+"""Benchmark box_scores.create_player_stats against the original SDK-model loop.
+
+Usage:
+    python benchmarks/player_stats_benchmark.py PAYLOAD.json
+    python benchmarks/player_stats_benchmark.py --record 2024 "Georgia Tech" PAYLOAD.json
+    python benchmarks/player_stats_benchmark.py --synthetic
+
+PAYLOAD.json is a recorded /games/players?year=&team= response. --record fetches one with the
+API key from .streamlit/secrets.toml and saves it before benchmarking.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cfbd
+import pandas as pd
+from box_scores import create_player_stats
+
+
+def legacy_create_player_stats(games_data):
+    # The loop team_results.py used before, fed with SDK models
+    game_stats = []
+    for game in games_data:
+        game_id = game.id
+        for team in game.teams:
+            team_name = team.team
+            for category in team.categories:
+                category_name = category.name
+                for stat_type in category.types:
+                    stat_name = stat_type.name
+                    for athlete in stat_type.athletes:
+                        game_stats.append({
+                            'game_id': game_id,
+                            'team': team_name,
+                            'category': category_name,
+                            'stat_name': stat_name,
+                            'athlete_id': athlete.id,
+                            'athlete_name': athlete.name,
+                            'stat_value': athlete.stat
+                        })
+    return pd.DataFrame(game_stats)
+
+
+def legacy_path(payload):
+    # SDK model instantiation was part of the old cost, so it is timed too
+    return legacy_create_player_stats([cfbd.GamePlayerStats.from_dict(game) for game in payload])
+
+
+def synthetic_season(games=13, athletes=6):
+    # Shaped like a /games/players response for one team's season
+    categories = {
+        'passing': ['C/ATT', 'YDS', 'AVG', 'TD', 'INT', 'QBR'],
+        'rushing': ['CAR', 'YDS', 'AVG', 'TD', 'LONG'],
+        'receiving': ['REC', 'YDS', 'AVG', 'TD', 'LONG'],
+        'defensive': ['TOT', 'SOLO', 'SACKS', 'TFL', 'PD', 'QB HUR', 'TD'],
+        'kicking': ['FG', 'PCT', 'LONG', 'XP', 'PTS'],
+        'punting': ['NO', 'YDS', 'AVG', 'TB', 'In 20', 'LONG'],
+    }
+    payload = []
+    for game_id in range(games):
+        teams = []
+        for side, team in (('home', 'Home U'), ('away', 'Away State')):
+            teams.append({'team': team, 'conference': 'ACC', 'homeAway': side, 'points': random.randint(0, 50),
+                          'categories': [{'name': name, 'types': [
+                              {'name': stat, 'athletes': [
+                                  {'id': str(athlete), 'name': f'Player {athlete}',
+                                   'stat': f'{random.randint(0, 20)}/{random.randint(20, 40)}' if '/' in stat
+                                   else str(random.randint(0, 150))}
+                                  for athlete in range(athletes)]}
+                              for stat in stats]}
+                              for name, stats in categories.items()]})
+        payload.append({'id': game_id, 'teams': teams})
+    return payload
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('payload', nargs='?')
+    parser.add_argument('--record', nargs=2, metavar=('YEAR', 'TEAM'))
+    parser.add_argument('--synthetic', action='store_true')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    if not args.synthetic and not args.payload:
+        parser.error('give a payload file (with --record to fetch it first) or --synthetic')
+
+    if args.synthetic:
+        payload = synthetic_season()
+    elif args.record:
+        from cfbd_client import get_json
+        payload = get_json('/games/players', {'year': int(args.record[0]), 'team': args.record[1]})
+        with open(args.payload, 'w', encoding='utf-8') as file:
+            json.dump(payload, file)
+    else:
+        with open(args.payload, 'r', encoding='utf-8') as file:
+            payload = json.load(file)
+
+    rows = len(create_player_stats(payload))
+    legacy = min(timeit.repeat(lambda: legacy_path(payload), number=1, repeat=args.repeat))
+    columnar = min(timeit.repeat(lambda: create_player_stats(payload), number=1, repeat=args.repeat))
+    print(f'{len(payload)} games, {rows} stat rows')
+    print(f'legacy (SDK models + row dicts): {legacy * 1000:8.1f} ms')
+    print(f'columnar (raw JSON):             {columnar * 1000:8.1f} ms')
+    print(f'speedup: {legacy / columnar:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+import pandas as pd
+import metrics
+
+PLAYER_STAT_COLUMNS = ['game_id', 'team', 'category', 'stat_name', 'athlete_id', 'athlete_name', 'stat_value']
+
+
+@metrics.timed
+def create_player_stats(games_data):
+    """Flatten raw /games/players JSON into one row per athlete stat.
+
+    Works on the decoded JSON directly (no SDK models) and fills one list per column. `team`,
+    `category` and `stat_name` are categorical; `stat_number` is the numeric form of the raw
+    `stat_value` string (NaN for values like '12/20').
+    """
+    columns = {column: [] for column in PLAYER_STAT_COLUMNS}
+    game_ids = columns['game_id'].extend
+    teams = columns['team'].extend
+    categories = columns['category'].extend
+    stat_names = columns['stat_name'].extend
+    athlete_ids = columns['athlete_id'].extend
+    athlete_names = columns['athlete_name'].extend
+    stat_values = columns['stat_value'].extend
+
+    for game in games_data:
+        game_id = game['id']
+        for team in game['teams']:
+            team_name = team['team']
+            for category in team['categories']:
+                category_name = category['name']
+                for stat_type in category['types']:
+                    athletes = stat_type['athletes']
+                    count = len(athletes)
+                    game_ids([game_id] * count)
+                    teams([team_name] * count)
+                    categories([category_name] * count)
+                    stat_names([stat_type['name']] * count)
+                    athlete_ids([athlete['id'] for athlete in athletes])
+                    athlete_names([athlete['name'] for athlete in athletes])
+                    stat_values([athlete['stat'] for athlete in athletes])
+
+    stats_df = pd.DataFrame(columns)
+    for column in ['team', 'category', 'stat_name']:
+        stats_df[column] = stats_df[column].astype('category')
+    stats_df['stat_number'] = pd.to_numeric(stats_df['stat_value'], errors='coerce')
+    return stats_df
+
+
+@metrics.timed
+def create_box_score_index(stats_df, team_stats_df):
+    """Group a season's stats by game once so a game's box score is a dictionary lookup.
+
+    Per-team box scores (team stats plus one pivot per category) are computed on first use and
+    memoized in index['box_scores'].
+    """
+    return {
+        'players': dict(tuple(stats_df.groupby('game_id', observed=True))) if not stats_df.empty else {},
+        'teams': dict(tuple(team_stats_df.groupby('game_id'))) if not team_stats_df.empty else {},
+        'box_scores': {},
+    }
+
+
+def create_box_score_side(name, team_stats, player_stats):
+    # Use the numeric stat where there is one, leave others (e.g. '12/20') unchanged
+    player_stats = player_stats.assign(stat_value=player_stats['stat_number'].astype(object).where(
+        player_stats['stat_number'].notna(), player_stats['stat_value']))
+    categories = []
+    for category, category_stats in player_stats.groupby('category', observed=True, sort=True):
+        pivot = pd.pivot_table(category_stats, values='stat_value', index='athlete_name',
+                               columns='stat_name', aggfunc='sum', observed=True)
+        categories.append((category, pivot))
+    return {
+        'name': name,
+        'team_stats': team_stats[['category', 'stat_value']],
+        'categories': categories,
+    }
+
+
+def get_box_score(index, game_id, team):
+    """Return {'team': side, 'opponent': side} for one game, seen from `team`."""
+    key = (game_id, team)
+    if key not in index['box_scores']:
+        players = index['players'].get(game_id, pd.DataFrame(columns=PLAYER_STAT_COLUMNS + ['stat_number']))
+        teams = index['teams'].get(game_id, pd.DataFrame(columns=['team', 'category', 'stat_value']))
+        is_team = players['team'] == team
+        other_players = players[~is_team]
+        opponent = other_players['team'].iloc[0] if not other_players.empty else 'Opponent'
+        index['box_scores'][key] = {
+            'team': create_box_score_side(team, teams[teams['team'] == team], players[is_team]),
+            'opponent': create_box_score_side(opponent, teams[teams['team'] != team], other_players),
+        }
+    return index['box_scores'][key]
@@ -0,0 +1,175 @@
+import collections
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+import requests
+import metrics
+import profiler
+import quota
+import response_cache
+import warehouse
+from backends import create_backend
+from circuit_breaker import CircuitBreaker, CircuitOpenError, is_upstream_failure
+
+# The live API, a local stand-in or recorded fixtures, depending on CFBD_BACKEND (see backends.py)
+backend = create_backend()
+
+# Requests actually sent upstream (cache hits excluded), per endpoint
+upstream_calls = collections.Counter()
+# Requests that piggybacked on an identical call already in flight, per endpoint
+coalesced_calls = collections.Counter()
+_counter_lock = threading.Lock()
+
+# Shared by every upstream call in the process
+breaker = CircuitBreaker()
+
+# Upstream calls in progress, by request; concurrent identical requests wait on the same Future
+_in_flight = {}
+_in_flight_lock = threading.Lock()
+
+# Bounded worker pool for fanning out independent calls, shared across sessions
+MAX_WORKERS = 16
+executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='cfbd-fetch')
+
+
+def get_json(endpoint, params=None, cache=True, essential=True, stale_ok=True):
+    """GET an API endpoint such as '/records' and return the decoded JSON body.
+
+    Completed seasons are answered from the local warehouse when it has them, then from the
+    on-disk response cache. An expired cache entry is returned immediately while a background
+    call refreshes it; pass stale_ok=False to fetch it again instead (the expired copy is then only
+    returned if upstream fails), e.g. when rebuilding a store that stamps its inputs as current.
+    Pass cache=False for data that must always be live (e.g. the scoreboard).
+    Upstream calls count against the API budget (see quota.py); near the cap, stale entries are
+    served without a refresh and calls marked essential=False are refused.
+    Concurrent identical requests share one upstream call and the same decoded payload, so
+    callers must not modify it.
+    Raises requests.exceptions.RequestException on connection errors, timeouts and non-2xx responses,
+    and, without calling upstream, CircuitOpenError while it keeps failing and QuotaExceededError
+    when the budget does not allow the call (both RequestExceptions).
+    """
+    if cache and response_cache.is_immutable(params):
+        payload = warehouse.get(endpoint, params)
+        if payload is not None:
+            metrics.count_cache('warehouse')
+            return payload
+    if cache:
+        entry = response_cache.lookup(endpoint, params)
+        if entry is not None:
+            payload, fresh = entry
+            if not fresh and not stale_ok and not quota.is_degraded():
+                try:
+                    return fetch_once(endpoint, params, cache, essential)
+                except requests.exceptions.RequestException:
+                    # Upstream is failing; the expired copy beats nothing (already counted as a miss)
+                    return payload
+            # Stale while revalidate: page latency is bounded by the cache, not by upstream.
+            # Near the budget cap the stale copy is good enough
+            metrics.count_cache('fresh' if fresh else 'stale')
+            if not fresh and not quota.is_degraded():
+                refresh_in_background(endpoint, params)
+            return payload
+    # Uncached calls are not a cache miss; they never looked
+    return fetch_once(endpoint, params, cache, essential, reader=cache)
+
+
+def refresh(endpoint, params):
+    try:
+        fetch_once(endpoint, params, True, reader=False)
+    except requests.exceptions.RequestException:
+        # Keep serving the stale copy; the breaker has counted the failure
+        pass
+
+
+def refresh_in_background(endpoint, params):
+    with _in_flight_lock:
+        if response_cache.cache_key(endpoint, params) in _in_flight:
+            return
+    submit(refresh, endpoint, params)
+
+
+def fetch_once(endpoint, params, cache, essential=True, reader=True):
+    # Single flight: the first caller for a request fetches it, later callers wait for its result.
+    # reader: a page's cache lookup missed (counted as a request outcome); otherwise a background
+    # refresh or an uncached call (counted apart, so they do not skew the hit ratio)
+    key = response_cache.cache_key(endpoint, params)
+    with _in_flight_lock:
+        future = _in_flight.get(key)
+        leader = future is None
+        if leader:
+            future = _in_flight[key] = Future()
+    if reader:
+        metrics.count_cache('miss' if leader else 'coalesced')
+    else:
+        metrics.count_other('refresh' if cache else 'uncached')
+    if not leader:
+        with _counter_lock:
+            coalesced_calls[endpoint] += 1
+        return future.result()
+
+    try:
+        quota.acquire(endpoint, essential)
+        if not breaker.allow():
+            # Not called after all, so not counted
+            quota.refund()
+            raise CircuitOpenError(f'CFBD API unavailable after repeated failures; retrying in {breaker.retry_in():.0f}s')
+        with _counter_lock:
+            upstream_calls[endpoint] += 1
+        start = time.perf_counter()
+        try:
+            payload = backend.get(endpoint, params)
+        except BaseException as e:
+            metrics.observe_upstream(endpoint, time.perf_counter() - start, e)
+            if isinstance(e, requests.exceptions.RequestException) and not is_upstream_failure(e):
+                # A 4xx still means upstream answered
+                breaker.record_success()
+            else:
+                # Anything else, e.g. an OSError saving a fixture, must still settle a half-open probe
+                breaker.record_failure()
+            raise
+        metrics.observe_upstream(endpoint, time.perf_counter() - start)
+        breaker.record_success()
+        if cache:
+            response_cache.put(endpoint, params, payload)
+        future.set_result(payload)
+        return payload
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _in_flight_lock:
+            del _in_flight[key]
+
+
+def submit(fn, *args):
+    """Run fn(*args) on the shared pool, still accounted to (and profiled with) the page and session submitting it."""
+    return executor.submit(profiler.attach(quota.attach(fn)), *args)
+
+
+def fetch_concurrently(calls, essential=True, stale_ok=True):
+    """Dispatch {name: (endpoint, params)} on the shared worker pool.
+
+    Returns {name: Future}; each future resolves to the payload or raises like get_json.
+    Upstream latency is recorded in metrics.upstream_latency.
+    """
+    return {name: submit(get_json, endpoint, params, True, essential, stale_ok) for name, (endpoint, params) in calls.items()}
+
+
+def in_flight():
+    with _in_flight_lock:
+        return len(_in_flight)
+
+
+def gauges():
+    """Point-in-time values for the metrics page and the Prometheus endpoint."""
+    usage = quota.usage()
+    return {
+        'cfbd_in_flight_requests': in_flight(),
+        'cfbd_breaker_open': int(breaker.state != 'closed'),
+        'cfbd_quota_calls_last_minute': usage['minute'],
+        'cfbd_quota_calls_this_month': usage['month'],
+    }
+
+
+# Optional Prometheus endpoint (CFBD_METRICS_PORT), started once per process
+metrics.serve_prometheus(gauges)
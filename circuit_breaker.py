@@ -0,0 +1,79 @@
+import os
+import random
+import threading
+import time
+import requests
+
+# Consecutive upstream failures before the breaker opens
+FAILURE_THRESHOLD = int(os.environ.get('CFBD_BREAKER_FAILURES', 5))
+# First wait before a retry (seconds); doubles on every failed retry up to MAX_BACKOFF
+BASE_BACKOFF = float(os.environ.get('CFBD_BREAKER_BACKOFF', 5))
+MAX_BACKOFF = float(os.environ.get('CFBD_BREAKER_MAX_BACKOFF', 300))
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised instead of calling upstream while the breaker is open."""
+
+
+def is_upstream_failure(error):
+    # Timeouts, connection errors, 5xx and rate limiting mean upstream is in trouble; other 4xx do not
+    if isinstance(error, (requests.exceptions.Timeout, requests.exceptions.ConnectionError)):
+        return True
+    if isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+        return error.response.status_code >= 500 or error.response.status_code == 429
+    return False
+
+
+class CircuitBreaker:
+    """Stop calling upstream after repeated failures and let one probe through after a jittered backoff.
+
+    closed: calls go through. open: calls fail fast until the backoff elapses. half-open: one probe
+    call goes through; success closes the breaker, failure reopens it with a longer backoff.
+    """
+
+    def __init__(self, failure_threshold=FAILURE_THRESHOLD, base_backoff=BASE_BACKOFF, max_backoff=MAX_BACKOFF):
+        self.failure_threshold = failure_threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self._lock = threading.Lock()
+        self.state = 'closed'
+        self.failures = 0
+        # Failed probes since the breaker last closed
+        self.opened = 0
+        self.retry_at = 0.0
+
+    def allow(self):
+        with self._lock:
+            if self.state == 'closed':
+                return True
+            if self.state == 'open' and time.time() >= self.retry_at:
+                self.state = 'half-open'
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = 'closed'
+            self.failures = 0
+            self.opened = 0
+
+    def record_failure(self):
+        with self._lock:
+            if self.state == 'open':
+                # Calls already in flight when the breaker tripped; it is open already
+                return
+            if self.state == 'half-open':
+                # Only a failed probe lengthens the backoff
+                self.opened += 1
+            else:
+                self.failures += 1
+                if self.failures < self.failure_threshold:
+                    return
+            # Jittered, so instances that failed together do not all retry together
+            backoff = min(self.max_backoff, self.base_backoff * 2 ** min(self.opened, 16))
+            self.retry_at = time.time() + random.uniform(backoff / 2, backoff)
+            self.failures = 0
+            self.state = 'open'
+
+    def retry_in(self):
+        return max(0.0, self.retry_at - time.time())
@@ -1,11 +1,14 @@
-import cfbd
+import os
 import streamlit as st
 
-# Initialize global variables
-API_KEY = st.secrets["cfbd_api_key"]
+# Initialize global variables; CFBD_API_KEY in the environment takes precedence over the secrets file
+try:
+    API_KEY = os.environ.get('CFBD_API_KEY') or st.secrets["cfbd_api_key"]
+except (KeyError, FileNotFoundError):
+    # Only the live API needs a key; fixture replay and a local stand-in run without one
+    API_KEY = None
 headers = {
     'accept': 'application/json',
-    'Authorization': f'Bearer {API_KEY}'
 }
-st.session_state.headers = headers
-configuration = cfbd.Configuration(access_token=API_KEY)
\ No newline at end of file
+if API_KEY is not None:
+    headers['Authorization'] = f'Bearer {API_KEY}'
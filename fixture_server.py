@@ -0,0 +1,67 @@
+"""Local stand-in for the CFBD API that serves recorded fixtures.
+
+Usage:
+    python fixture_server.py FIXTURES_DIR [--port 8765] [--latency 150] [--jitter 50]
+                             [--error-rate 0.05] [--error-status 503]
+
+Then point the app at it:
+    CFBD_BASE_URL=http://localhost:8765 streamlit run team_results.py
+
+Record fixtures with CFBD_RECORD=FIXTURES_DIR against the live API, or reuse a response cache
+directory. Requests without a fixture get a 404. Every response is delayed by --latency
+milliseconds, plus or minus up to --jitter. A --error-rate fraction of requests fail with
+--error-status.
+"""
+import argparse
+import json
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+from backends import load_fixture
+
+
+def create_handler(directory, latency, jitter, error_rate, error_status):
+    class FixtureHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlsplit(self.path)
+            params = dict(parse_qsl(url.query))
+            time.sleep(max(0.0, latency + random.uniform(-jitter, jitter)) / 1000)
+            if random.random() < error_rate:
+                self.send_json(error_status, {'message': 'Injected error'})
+                return
+            payload = load_fixture(directory, url.path, params)
+            if payload is None:
+                self.send_json(404, {'message': f'No fixture for {url.path} {params}'})
+            else:
+                self.send_json(200, payload)
+
+        def send_json(self, status, body):
+            data = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    return FixtureHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('fixtures')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0, help='milliseconds added to every response')
+    parser.add_argument('--jitter', type=float, default=0, help='random +/- milliseconds on top of --latency')
+    parser.add_argument('--error-rate', type=float, default=0, help='fraction of requests that fail')
+    parser.add_argument('--error-status', type=int, default=503)
+    args = parser.parse_args()
+
+    handler = create_handler(args.fixtures, args.latency, args.jitter, args.error_rate, args.error_status)
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), handler)
+    print(f'Serving fixtures from {args.fixtures} on http://127.0.0.1:{args.port}')
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,21 @@
+from string import Formatter
+import pandas as pd
+
+
+def render_template(template, frame):
+    """Fill a str.format-style template once per row of `frame` using vectorized string concatenation.
+
+    Every {field} in the template must be a column of `frame`; missing values render as ''.
+    Returns a string Series aligned with `frame`.
+    """
+    html = pd.Series('', index=frame.index, dtype='string')
+    for literal, field, _, _ in Formatter().parse(template):
+        html = html + literal
+        if field is not None:
+            html = html + frame[field].astype('string').fillna('')
+    return html
+
+
+def int_column(values):
+    # Whole numbers without a trailing '.0' (merges turn int columns into floats); missing -> ''
+    return pd.to_numeric(values, errors='coerce').round().astype('Int64').astype('string').fillna('')
@@ -0,0 +1,190 @@
+"""Process-wide instrumentation: upstream latency and bytes, cache hits, page reruns and frame builds.
+
+pages/admin_metrics.py shows it; set CFBD_METRICS_PORT to also serve it in Prometheus text format at
+http://HOST:PORT/metrics.
+"""
+import bisect
+import collections
+import functools
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import profiler
+
+# Histogram bucket upper bounds (seconds), shared by every timing
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+# Recent samples kept per series for percentiles
+RECENT = 1000
+METRICS_PORT = int(os.environ.get('CFBD_METRICS_PORT', 0))
+
+
+class Timing:
+    """Cumulative bucket counts (for Prometheus) plus the most recent samples (for percentiles)."""
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.recent = collections.deque(maxlen=RECENT)
+
+    def observe(self, seconds):
+        self.buckets[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.recent.append(seconds)
+
+    def percentile(self, share):
+        samples = sorted(self.recent)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(share * len(samples)))]
+
+
+_lock = threading.Lock()
+upstream_latency = collections.defaultdict(Timing)
+upstream_errors = collections.Counter()
+upstream_bytes = collections.Counter()
+# Where pages' get_json lookups were answered: warehouse, fresh, stale, coalesced or miss
+cache_events = collections.Counter()
+# Calls made for no page lookup: background refreshes of stale entries and uncached calls
+other_requests = collections.Counter()
+rerun_durations = collections.defaultdict(Timing)
+build_durations = collections.defaultdict(Timing)
+_reruns = threading.local()
+_server = None
+
+
+def observe_upstream(endpoint, seconds, error=None):
+    with _lock:
+        upstream_latency[endpoint].observe(seconds)
+        if error is not None:
+            upstream_errors[endpoint] += 1
+
+
+def count_bytes(endpoint, size):
+    with _lock:
+        upstream_bytes[endpoint] += size
+
+
+def count_cache(event):
+    with _lock:
+        cache_events[event] += 1
+
+
+def count_other(kind):
+    with _lock:
+        other_requests[kind] += 1
+
+
+def timed(fn):
+    """Record how long each call of a frame-building function takes, under its name."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            with _lock:
+                build_durations[fn.__name__].observe(elapsed)
+    return wrapper
+
+
+def rerun_started(page):
+    # Called at the top of a page script; the script thread runs one rerun at a time
+    _reruns.page, _reruns.start = page, time.perf_counter()
+    profiler.start(page)
+
+
+def rerun_finished():
+    # Called at the bottom of a page script; reruns cut short by st.rerun or an exception are not recorded
+    start = getattr(_reruns, 'start', None)
+    if start is None:
+        return
+    elapsed = time.perf_counter() - start
+    _reruns.start = None
+    if profiler.finish():
+        # Profiled reruns run slower; keep them out of the timings
+        return
+    with _lock:
+        rerun_durations[_reruns.page].observe(elapsed)
+
+
+def counters():
+    """Copies of the upstream error, byte, request outcome and other request counters."""
+    with _lock:
+        return {'errors': dict(upstream_errors), 'bytes': dict(upstream_bytes), 'requests': dict(cache_events),
+                'other': dict(other_requests)}
+
+
+def summary(timings):
+    """{name: {'count', 'p50', 'p95', 'p99', 'mean'}} for a dict of Timings, in seconds."""
+    with _lock:
+        return {name: {
+            'count': timing.count,
+            'p50': timing.percentile(0.5),
+            'p95': timing.percentile(0.95),
+            'p99': timing.percentile(0.99),
+            'mean': timing.total / timing.count if timing.count else None,
+        } for name, timing in timings.items()}
+
+
+def prometheus_histogram(lines, metric, label, timings):
+    for name, timing in timings.items():
+        cumulative = 0
+        for bound, count in zip(BUCKETS + ('+Inf',), timing.buckets):
+            cumulative += count
+            lines.append(f'{metric}_bucket{{{label}="{name}",le="{bound}"}} {cumulative}')
+        lines.append(f'{metric}_sum{{{label}="{name}"}} {timing.total}')
+        lines.append(f'{metric}_count{{{label}="{name}"}} {timing.count}')
+
+
+def prometheus_text(gauges=None):
+    """Everything recorded so far in the Prometheus text exposition format, plus `gauges` ({name: value})."""
+    lines = []
+    with _lock:
+        lines.append('# TYPE cfbd_upstream_seconds histogram')
+        prometheus_histogram(lines, 'cfbd_upstream_seconds', 'endpoint', upstream_latency)
+        lines.append('# TYPE cfbd_upstream_errors_total counter')
+        lines += [f'cfbd_upstream_errors_total{{endpoint="{name}"}} {count}' for name, count in upstream_errors.items()]
+        lines.append('# TYPE cfbd_upstream_bytes_total counter')
+        lines += [f'cfbd_upstream_bytes_total{{endpoint="{name}"}} {count}' for name, count in upstream_bytes.items()]
+        lines.append('# TYPE cfbd_requests_total counter')
+        lines += [f'cfbd_requests_total{{outcome="{name}"}} {count}' for name, count in cache_events.items()]
+        lines.append('# TYPE cfbd_other_requests_total counter')
+        lines += [f'cfbd_other_requests_total{{kind="{name}"}} {count}' for name, count in other_requests.items()]
+        lines.append('# TYPE cfbd_rerun_seconds histogram')
+        prometheus_histogram(lines, 'cfbd_rerun_seconds', 'page', rerun_durations)
+        lines.append('# TYPE cfbd_build_seconds histogram')
+        prometheus_histogram(lines, 'cfbd_build_seconds', 'function', build_durations)
+    for name, value in (gauges or {}).items():
+        lines.append(f'# TYPE {name} gauge')
+        lines.append(f'{name} {value}')
+    return '\n'.join(lines) + '\n'
+
+
+def serve_prometheus(gauges, port=METRICS_PORT):
+    """Serve prometheus_text(gauges()) on `port` from a daemon thread, once per process; no-op if port is 0."""
+    global _server
+    with _lock:
+        if not port or _server is not None:
+            return
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != '/metrics':
+                    self.send_error(404)
+                    return
+                body = prometheus_text(gauges()).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        _server = ThreadingHTTPServer(('0.0.0.0', port), MetricsHandler)
+        threading.Thread(target=_server.serve_forever, name='metrics-server', daemon=True).start()
@@ -0,0 +1,87 @@
+import streamlit as st
+import pandas as pd
+import cfbd_client
+import metrics
+import quota
+
+st.sidebar.title("CFB Data")
+
+
+def timing_table(timings, label):
+    # One row per series with call count and p50/p95/p99/mean in milliseconds
+    summary = pd.DataFrame.from_dict(metrics.summary(timings), orient='index')
+    if summary.empty:
+        return pd.DataFrame(columns=[label, 'Count', 'p50 ms', 'p95 ms', 'p99 ms', 'Mean ms'])
+    summary[['p50', 'p95', 'p99', 'mean']] = (summary[['p50', 'p95', 'p99', 'mean']].astype(float) * 1000).round(1)
+    summary = summary.rename(columns={'count': 'Count', 'p50': 'p50 ms', 'p95': 'p95 ms', 'p99': 'p99 ms', 'mean': 'Mean ms'})
+    return summary.rename_axis(label).reset_index().sort_values('Count', ascending=False)
+
+
+def display_overview():
+    gauges = cfbd_client.gauges()
+    events = metrics.counters()['requests']
+    requests_total = sum(events.values())
+    served_locally = requests_total - events.get('miss', 0)
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("In-flight upstream requests", gauges['cfbd_in_flight_requests'])
+    col2.metric("Circuit breaker", cfbd_client.breaker.state)
+    col3.metric("Cache hit ratio", f"{served_locally / requests_total:.0%}" if requests_total else "n/a")
+    usage = quota.usage()
+    budget = f" of {usage['per_month']}" if usage['per_month'] else ""
+    col4.metric("API calls this month", f"{usage['month']}{budget}")
+
+
+def display_upstream():
+    st.markdown("#### Upstream calls")
+    counters = metrics.counters()
+    table = timing_table(metrics.upstream_latency, 'Endpoint')
+    table['Errors'] = table['Endpoint'].map(counters['errors']).fillna(0).astype(int)
+    table['Bytes'] = table['Endpoint'].map(counters['bytes']).fillna(0).astype(int)
+    table['Coalesced'] = table['Endpoint'].map(dict(cfbd_client.coalesced_calls)).fillna(0).astype(int)
+    st.dataframe(table, hide_index=True, use_container_width=True)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("#### Where page requests were answered")
+        events = pd.Series(counters['requests'], name='Requests', dtype=int)
+        st.dataframe(events.rename_axis('Outcome').reset_index(), hide_index=True, use_container_width=True)
+    with col2:
+        st.markdown("#### Background refreshes and uncached calls")
+        other = pd.Series(counters['other'], name='Requests', dtype=int)
+        st.dataframe(other.rename_axis('Kind').reset_index(), hide_index=True, use_container_width=True)
+
+
+def display_pages():
+    st.markdown("#### Page reruns")
+    st.dataframe(timing_table(metrics.rerun_durations, 'Page'), hide_index=True, use_container_width=True)
+    st.markdown("#### DataFrame builds")
+    st.dataframe(timing_table(metrics.build_durations, 'Function'), hide_index=True, use_container_width=True)
+
+
+def display_quota():
+    usage = quota.usage()
+    st.markdown("#### API budget")
+    per_minute = f" of {usage['per_minute']}" if usage['per_minute'] else ""
+    st.write(f"Last minute: {usage['minute']}{per_minute} calls. Degraded: {'yes' if quota.is_degraded() else 'no'}.")
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("##### By page")
+        st.dataframe(pd.Series(usage['by_page'], name='Calls', dtype=int).rename_axis('Page').reset_index(),
+                     hide_index=True, use_container_width=True)
+    with col2:
+        st.markdown("##### By session")
+        st.dataframe(pd.Series(usage['by_session'], name='Calls', dtype=int).rename_axis('Session').reset_index(),
+                     hide_index=True, use_container_width=True)
+
+
+# Main body
+st.header("Metrics", divider='blue')
+st.caption("Since this server process started. Set CFBD_METRICS_PORT to scrape the same data in Prometheus format. "
+           "Add ?profile=1 to any page's URL to profile its reruns.")
+st.button("Refresh")
+display_overview()
+display_upstream()
+display_pages()
+display_quota()
+st.download_button("Download Prometheus text", metrics.prometheus_text(cfbd_client.gauges()),
+                   file_name='cfbd_metrics.txt', mime='text/plain')
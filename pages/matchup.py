@@ -1,9 +1,10 @@
 from datetime import datetime
-import json
-import pandas as pd
-import requests
 import streamlit as st
-from config_api import headers
+import ratings_store
+from team_directory import get_team, team_names
+import metrics
+
+metrics.rerun_started('matchup')
 
 # YEAR = 2024
 st.sidebar.title("CFB Data")
@@ -14,11 +15,8 @@ def select_team_year():
                                    max_value=datetime.now().year,
                                    step=1,
                                    value=2024)
-    # Load the JSON data from the uploaded file
-    with open('team_info.json') as f:
-        team_data = json.load(f)
-    # Filter teams with classification "fbs" or "fcs"
-    filtered_teams = sorted([team['school'] for team in team_data if team['classification'] in ['fbs']])
+    # Team names with classification "fbs"
+    filtered_teams = team_names(include_fcs=False)
     if st.session_state.team != '':
         team_index = filtered_teams.index(st.session_state.team)
     else:
@@ -28,65 +26,21 @@ def select_team_year():
     return team_1, team_2, year
 
 def team_information(team):
-    with open('team_info.json', 'r') as file:
-        data_dict = json.load(file)
-    team_df = pd.DataFrame(data_dict)
-    for school in team_df['school']:
-        if school == team:
-            # set team_color = color for school = team
-            team_color = team_df[team_df['school'] == team]['color'].values[0]
-            team_logo = team_df[team_df['school'] == team]['logos'].values[0][0]
-            return team_color, team_logo
-
-def get_ratings(url, team):
-    querystring = {"team":team,"year":year}
-    payload = ""
-    response = requests.request("GET", url, data=payload, headers=headers, params=querystring)
-    return response.json()
-
-def get_fpi(team):
-    link = "https://api.collegefootballdata.com/ratings/fpi"
-    team_stat = pd.DataFrame(get_ratings(link, team))
-    return team_stat['fpi'].values[0]
-
-def get_elo(team):
-    link = "https://api.collegefootballdata.com/ratings/elo"
-    team_stat = pd.DataFrame(get_ratings(link, team))
-    return team_stat['elo'].values[0]
-
-def get_srs(team):
-    link = "https://api.collegefootballdata.com/ratings/srs"
-    team_stat = pd.DataFrame(get_ratings(link, team))
-    return team_stat['rating']
-
-def get_sp(team):
-    link = "https://api.collegefootballdata.com/ratings/sp"
-    team_stat = pd.DataFrame(get_ratings(link, team))
-    team_stat = team_stat[team_stat['team'] == team]
-    return team_stat['rating']
+    team_info = get_team(team)
+    if team_info:
+        return team_info['color'], team_info['logo']
 
+# Ratings, records and season stats come from one season-wide fetch shared by every pairing
 def get_stats(team):
-    fpi = get_fpi(team)
-    elo = get_elo(team)
-    srs = get_srs(team)
-    sp = get_sp(team)
-    stats_df = pd.DataFrame({'FPI':fpi, 'ELO':elo, 'SRS':srs, 'SP':sp})
-    return stats_df
+    return ratings_store.team_ratings(year, team)
 
 def get_games_played(team):
-    link = "https://api.collegefootballdata.com/records"
-    team_games = pd.DataFrame(get_ratings(link, team))
-    team_games['games_played'] = team_games['total'].apply(lambda x: x['games'] if isinstance(x, dict) else None)
-    played = team_games[team_games['games_played'].notnull()]
-    return played['games_played'].iloc[0]
+    return ratings_store.games_played(year, team)
 
 def get_team_stats(team):
-    link = "https://api.collegefootballdata.com/stats/season"
-    team_stats = pd.DataFrame(get_ratings(link, team))
+    team_stats = ratings_store.team_season_stats(year, team)
     games_played = get_games_played(team)
-    team_stats = team_stats[['statName', 'statValue']]
-    team_stats = team_stats.sort_values(by='statName')
-    team_stats['statPerGame'] = team_stats['statValue'] / games_played
+    team_stats['statPerGame'] = team_stats['statValue'] / games_played if games_played else None
     return team_stats
 
 def display_ratings():
@@ -141,6 +95,9 @@ team_2_metrics_df = get_stats(team_2)
 team_1_stats_df = get_team_stats(team_1)
 team_2_stats_df = get_team_stats(team_2)
 col1, col2 = st.columns(2)
+skipped = ratings_store.skipped_ratings(year)
+if skipped:
+    st.caption(f"{', '.join(skipped)} not shown to save API budget.")
 display_ratings()
 display_stats()
-
+metrics.rerun_finished()
@@ -1,68 +1,21 @@
 from datetime import date
-import json
 import streamlit as st
 import streamlit.components.v1 as components
 import pandas as pd
-import requests
-from config_api import headers
-
-YEAR = 2024
-
-# Update this function to return both logos and colors
-def team_information():
-    with open('team_info.json', 'r') as file:
-        data_dict = json.load(file)
-    colors_logos_df = pd.DataFrame(data_dict)
-    colors_logos_df = colors_logos_df[['school', 'logos', 'color', 'mascot']]  # Add color here
-    # drop rows with logos = None
-    colors_logos_df = colors_logos_df[colors_logos_df['logos'].notna()]
-    colors_logos_df['logos'] = colors_logos_df['logos'].apply(lambda x: x[0] if isinstance(x, list) else x)
-    return colors_logos_df
-
-# Function to get team logo and color based on school name
-def get_team_logo_color(team_name, team_info_df):
-    team_data = team_info_df[team_info_df['school'] == team_name]
-    if not team_data.empty:
-        logo = team_data.iloc[0]['logos']
-        color = team_data.iloc[0]['color']
-        if team_data.iloc[0]['mascot']:
-            mascot = team_data.iloc[0]['mascot']
-        else:
-            mascot = "  "
-        return logo, color, mascot
-    return None, "#000000", " "  # Default to black if not found
+from cfbd_client import get_json
+from html_templates import render_template
+from team_directory import team_attribute
+from season_records import get_season_records
+from poll_history import get_season, ranked_teams, rank_trajectories, week_polls
+import metrics
 
+metrics.rerun_started('polls')
 
-def get_records(year):
-    url = f'https://api.collegefootballdata.com/records?year={year}'
-    response = requests.get(url, headers=headers)
-    if response.status_code == 200:
-        return response.json()
-    else:
-        raise Exception(f"Failed to fetch data. Status code: {response.status_code}")
-
-
-def create_records(valid_records):
-    if not valid_records:
-        return pd.DataFrame()
-    team_records_list = []
-    for record in valid_records:
-        team_record = {
-            'team': record['team'],
-            'Total Wins': record['total'].get('wins', 0),
-            'Total Losses': record['total'].get('losses', 0),
-            'Conference Wins': record['conferenceGames'].get('wins', 0),
-            'Conference Losses': record['conferenceGames'].get('losses', 0),
-        }
-        team_records_list.append(team_record)
-    return pd.DataFrame(team_records_list)
-
+YEAR = 2024
 
 def get_schedule():
-    url = "https://api.collegefootballdata.com/calendar"
     querystring = {"year": YEAR}
-    response = requests.request("GET", url, headers=headers, params=querystring)
-    weeks = pd.DataFrame(response.json())
+    weeks = pd.DataFrame(get_json("/calendar", querystring))
     return weeks
 
 def select_week():
@@ -82,43 +35,7 @@ def select_week():
     week = selected.index(selected_week) + 1
     return week
 
-# Pass the week as a parameter
-def get_polls(week):
-    url = "https://api.collegefootballdata.com/rankings"
-    querystring = {"year": YEAR, "week": week}
-    response = requests.request("GET", url, headers=headers, params=querystring)
-    polls = response.json()
-    return polls
-
-# Function to create a DataFrame for a given poll's ranks
-def create_poll_df(poll_data):
-    ranks = poll_data['ranks']
-    poll_name = poll_data['poll']
-
-    # Extract the required fields for each rank
-    poll_ranks = [
-        {
-            'Rank': rank['rank'],
-            'School': rank['school'],
-            'Conference': rank['conference'],
-            'First Place Votes': rank.get('firstPlaceVotes', 0),  # Handle missing firstPlaceVotes
-            'Points': rank['points']
-        }
-        for rank in ranks
-    ]
-
-    # Create a DataFrame from the list of dicts
-    df = pd.DataFrame(poll_ranks)
-    df.name = poll_name  # Add the poll name to the DataFrame for reference
-    return df
-
-
-# Function to display poll rankings with logos and colors in a table format
-def display_poll(poll_data, team_info_df):
-    st.markdown(f"### {poll_data['poll']}")
-
-    # Create the table headers with the same font as Streamlit
-    html = """
+POLL_HEAD = """
     <table style="width: 100%; border-collapse: collapse; font-family: 'helvetica'; font-size: 16px;">
         <thead>
             <tr style="background-color: #f2f2f2;">
@@ -131,81 +48,88 @@ def display_poll(poll_data, team_info_df):
         </thead>
         <tbody>
     """
-
-    # Add a row for each team
-    for team in poll_data['ranks']:
-        logo, color, mascot = get_team_logo_color(team['school'], team_info_df)
-
-        # Filter the records DataFrame to get the corresponding team record
-        team_record = records[records['team'] == team['school']]
-        if not team_record.empty:
-            wins = team_record.iloc[0]['Total Wins']
-            losses = team_record.iloc[0]['Total Losses']
-        else:
-            wins = "N/A"
-            losses = "N/A"
-
-        first_place_votes = team.get('firstPlaceVotes', 0)
-        conference = team['conference']
-        points = team['points']
-
-        # Add each row with team info, including records
-        html += f"""
+POLL_ROW = """
                     <tr>
-                        <td style="padding: 8px; border: 1px solid #ddd; text-align: center;"><b>{team['rank']}</b></td>
+                        <td style="padding: 8px; border: 1px solid #ddd; text-align: center;"><b>{rank}</b></td>
                         <td style="padding: 8px; border: 1px solid #ddd; display: flex; align-items: center;">
                             <img src="{logo}" width="30" height="30" style="margin-right: 10px;">
-                            <span style="color: {color}; font-weight: bold; font-size: 20px;">{team['school']} {mascot}</span>
+                            <span style="color: {color}; font-weight: bold; font-size: 20px;">{school} {mascot}</span>
                             <span style="margin-left: 10px;">({wins} - {losses})</span>  <!-- Use <span> instead of <p> -->
                         </td>
                         <td style="padding: 8px; border: 1px solid #ddd; text-align: center;">{conference}</td>
                         <td style="padding: 8px; border: 1px solid #ddd; text-align: center;">{first_place_votes}</td>
-                        <td style="padding: 8px; border: 1px solid #ddd; text-align: center;">{points:,}</td>
+                        <td style="padding: 8px; border: 1px solid #ddd; text-align: center;">{points}</td>
                     </tr>
                     """
-
-    # Close the table
-    html += """
+POLL_TAIL = """
         </tbody>
     </table>
     """
+# Polls shown first, in this order; any others follow
+POLL_ORDER = ["Playoff Committee Rankings", "AP Top 25", "Coaches Poll"]
 
-    # Use st.components.v1.html to properly render the HTML
-    components.html(html, height=600, scrolling=True)
-
-
-# Main app logic
-week = select_week()
-team_info_df = team_information()
-polls = get_polls(week)  # Pass the selected week to the get_polls function
-records = create_records(get_records(YEAR))
 
-# Separate the AP and Coaches polls from the rest
-ap_poll = None
-coaches_poll = None
-playoff_rankings = None
-other_polls = []
+# Function to display poll rankings with logos and colors in a table format
+def display_poll(poll_name, ranks):
+    st.markdown(f"### {poll_name}")
+
+    # Logos, colors, mascots and records for every ranked team at once
+    records = get_season_records(YEAR).drop_duplicates('team').set_index('team')
+    rows = pd.DataFrame({
+        'rank': ranks['rank'],
+        'school': ranks['school'],
+        'logo': team_attribute(ranks['school'], 'logo'),
+        'color': team_attribute(ranks['school'], 'color').fillna("#000000"),  # Default to black if not found
+        'mascot': team_attribute(ranks['school'], 'mascot').fillna("  "),
+        'wins': ranks['school'].map(records['Total Wins']).astype('Int64').astype('string').fillna("N/A"),
+        'losses': ranks['school'].map(records['Total Losses']).astype('Int64').astype('string').fillna("N/A"),
+        'conference': ranks['conference'],
+        'first_place_votes': ranks['first_place_votes'],
+        'points': ranks['points'].map('{:,}'.format),
+    })
+    html = POLL_HEAD + ''.join(render_template(POLL_ROW, rows)) + POLL_TAIL
 
-for poll in polls[0]['polls']:
-    if poll['poll'] == "Playoff Committee Rankings":
-        playoff_rankings = poll
-    elif poll['poll'] == "AP Top 25":
-        ap_poll = poll
-    elif poll['poll'] == "Coaches Poll":
-        coaches_poll = poll
-    else:
-        other_polls.append(poll)
+    # Use st.components.v1.html to properly render the HTML
+    components.html(html, height=600, scrolling=True)
 
-# Display the AP poll first, followed by the Coaches poll, then the rest
-if playoff_rankings:
-    display_poll(playoff_rankings, team_info_df)
 
-if ap_poll:
-    display_poll(ap_poll, team_info_df)
+def display_trajectories():
+    # Rank history for a few teams in one poll, sliced from the season already in memory
+    polls = get_season(YEAR)['polls']
+    poll_name = st.sidebar.selectbox("Select poll", polls, index=polls.index("AP Top 25") if "AP Top 25" in polls else 0)
+    teams = ranked_teams(YEAR, poll_name)
+    selected = st.sidebar.multiselect("Teams", teams, default=teams[:5])
+    st.header(f"{poll_name} rank trajectories")
+    if not selected:
+        st.write("Select one or more teams.")
+        return
+    trajectory = rank_trajectories(YEAR, poll_name, selected)
+    st.markdown("#### Rank by week")
+    st.dataframe(trajectory.pivot(index='week', columns='school', values='rank').astype('Int64'),
+                 use_container_width=True)
+    st.markdown("#### Points by week")
+    st.line_chart(trajectory.pivot(index='week', columns='school', values='points'))
+    for team in selected:
+        team_trajectory = trajectory[trajectory['school'] == team]
+        st.markdown(f"#### {team}")
+        st.dataframe(pd.DataFrame({
+            'Week': team_trajectory['week'],
+            'Rank': team_trajectory['rank'],
+            'Movement': team_trajectory['movement'].astype('Int64').astype('string').fillna('NR'),
+            'First Place Votes': team_trajectory['first_place_votes'],
+            'Points': team_trajectory['points'],
+        }), hide_index=True, use_container_width=True)
 
-if coaches_poll:
-    display_poll(coaches_poll, team_info_df)
 
-# Optionally display other polls
-for poll in other_polls:
-    display_poll(poll, team_info_df)
\ No newline at end of file
+# Main app logic
+view = st.sidebar.radio("View", ["Weekly polls", "Rank trajectories"])
+if view == "Weekly polls":
+    week = select_week()
+    # The whole season's polls are fetched once; a week is a local slice
+    polls = week_polls(YEAR, week)
+    # Display the Playoff rankings first, then the AP and Coaches polls, then the rest
+    for poll_name in sorted(polls, key=lambda name: POLL_ORDER.index(name) if name in POLL_ORDER else len(POLL_ORDER)):
+        display_poll(poll_name, polls[poll_name])
+else:
+    display_trajectories()
+metrics.rerun_finished()
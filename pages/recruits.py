@@ -1,21 +1,18 @@
-import json
 from datetime import datetime
-import requests
 import streamlit as st
 import pandas as pd
-from config_api import headers
+from cfbd_client import get_json
+from quota import QuotaExceededError
+from team_directory import get_team, team_names
+import metrics
+
+metrics.rerun_started('recruits')
 
 
 def team_information():
-    with open('team_info.json', 'r') as file:
-        data_dict = json.load(file)
-    team_df = pd.DataFrame(data_dict)
-    for school in team_df['school']:
-        if school == team:
-            # set team_color = color for school = team
-            team_color = team_df[team_df['school'] == team]['color'].values[0]
-            team_logo = team_df[team_df['school'] == team]['logos'].values[0][0]
-            return team_color, team_logo
+    team_info = get_team(team)
+    if team_info:
+        return team_info['color'], team_info['logo']
 
 
 def select_team_year():
@@ -24,11 +21,8 @@ def select_team_year():
                                    max_value=datetime.now().year + 1,
                                    step=1,
                                    value=2024)
-    # Load the JSON data from the uploaded file
-    with open('team_info.json') as f:
-        team_data = json.load(f)
-    # Filter teams with classification "fbs" or "fcs"
-    filtered_teams = sorted([team['school'] for team in team_data if team['classification'] in ['fbs', 'fcs']])
+    # Team names with classification "fbs" or "fcs"
+    filtered_teams = team_names(include_fcs=True)
     team_index = filtered_teams.index(st.session_state.team)
     team = st.sidebar.selectbox('Select Team Name', options=filtered_teams, index=team_index)
     st.session_state.team = team
@@ -37,33 +31,26 @@ def select_team_year():
 
 
 def get_recruits():
-    url = "https://api.collegefootballdata.com/recruiting/players"
     querystring = {"year": year, "team": team}
-    payload = ""
-    response = requests.request("GET", url, data=payload, headers=headers, params=querystring)
-    recruits_df = pd.DataFrame(response.json())
+    recruits_df = pd.DataFrame(get_json("/recruiting/players", querystring))
     return recruits_df
 
 
 def get_transfers():
-    url = "https://api.collegefootballdata.com/player/portal"
     querystring = {"year": year}
-    payload = ""
-    response = requests.request("GET", url, data=payload, headers=headers, params=querystring)
-    transfers_df = pd.DataFrame(response.json())
+    # The whole year's portal is the biggest call on the page, so it is the first to go near the API budget cap
+    transfers_df = pd.DataFrame(get_json("/player/portal", querystring, essential=False))
     transfers_in_df = transfers_df[transfers_df['destination'] == team]
     transfers_out_df = transfers_df[transfers_df['origin'] == team]
     return transfers_in_df, transfers_out_df
 
 
 def display_team_rating():
-    url = "https://api.collegefootballdata.com/recruiting/teams"
     querystring = {"year": year, "team": team}
-    payload = ""
-    response = requests.request("GET", url, data=payload, headers=headers, params=querystring)
-    if len(response.json()) > 0:
-        team_rank = response.json()[0]['rank']
-        team_points = response.json()[0]['points']
+    team_ratings = get_json("/recruiting/teams", querystring)
+    if len(team_ratings) > 0:
+        team_rank = team_ratings[0]['rank']
+        team_points = team_ratings[0]['points']
         st.markdown(f'##### National Rank: {team_rank} | Points: {team_points}')
 
 
@@ -133,5 +120,10 @@ st.markdown(f"""
 recruits_df = get_recruits()
 display_recruits()
 if year in range(2021, datetime.now().year):
-    transfers_in_df, transfers_out_df = get_transfers()
-    display_transfers()
\ No newline at end of file
+    try:
+        transfers_in_df, transfers_out_df = get_transfers()
+    except QuotaExceededError as e:
+        st.info(f"Transfers not shown: {e}")
+    else:
+        display_transfers()
+metrics.rerun_finished()
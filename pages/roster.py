@@ -1,21 +1,17 @@
-import json
 from datetime import datetime
 import streamlit as st
 import pandas as pd
-import requests
-from config_api import headers
+from cfbd_client import get_json
+from team_directory import get_team, team_names
+import metrics
+
+metrics.rerun_started('roster')
 
 
 def team_information():
-    with open('team_info.json', 'r') as file:
-        data_dict = json.load(file)
-    team_df = pd.DataFrame(data_dict)
-    for school in team_df['school']:
-        if school == team:
-            # set team_color = color for school = team
-            team_color = team_df[team_df['school'] == team]['color'].values[0]
-            team_logo = team_df[team_df['school'] == team]['logos'].values[0][0]
-            return team_color, team_logo
+    team_info = get_team(team)
+    if team_info:
+        return team_info['color'], team_info['logo']
 
 
 def select_team_year():
@@ -24,11 +20,8 @@ def select_team_year():
                                    max_value=datetime.now().year + 1,
                                    step=1,
                                    value=2024)
-    # Load the JSON data from the uploaded file
-    with open('team_info.json') as f:
-        team_data = json.load(f)
-    # Filter teams with classification "fbs" or "fcs"
-    filtered_teams = sorted([team['school'] for team in team_data if team['classification'] in ['fbs', 'fcs']])
+    # Team names with classification "fbs" or "fcs"
+    filtered_teams = team_names(include_fcs=True)
     team_index = filtered_teams.index(st.session_state.team)
     team = st.sidebar.selectbox('Select Team Name', options=filtered_teams, index=team_index)
     st.session_state.team = team
@@ -37,20 +30,14 @@ def select_team_year():
 
 
 def get_roster():
-    url = "http://api.collegefootballdata.com/roster"
     querystring = {"team":team,"year":year}
-    payload = ""
-    response = requests.request("GET", url, data=payload, headers=headers, params=querystring)
-    roster = pd.DataFrame(response.json())
+    roster = pd.DataFrame(get_json("/roster", querystring))
     return roster
 
 
 def get_nfl_picks():
-    url = "https://api.collegefootballdata.com/draft/picks"
     querystring = {"year": (year + 1), "college": team}
-    payload = ""
-    response = requests.request("GET", url, data=payload, headers=headers, params=querystring)
-    nfl_picks = pd.DataFrame(response.json())
+    nfl_picks = pd.DataFrame(get_json("/draft/picks", querystring))
     return nfl_picks
 
 
@@ -106,4 +93,5 @@ nfl_picks_df = get_nfl_picks()
 if len(nfl_picks_df) > 0:
     display_nfl_picks()
 roster_df = get_roster()
-display_roster()
\ No newline at end of file
+display_roster()
+metrics.rerun_finished()
@@ -1,69 +1,22 @@
-import json
 from datetime import date
-from config_api import headers
+from cfbd_client import get_json
+from schedule_weeks import get_season, season_game_cards, week_game_cards
+from html_templates import int_column, render_template
 import streamlit as st
 import pandas as pd
-import requests
+import metrics
 
+metrics.rerun_started('schedules')
 
-YEAR = 2024
-
-def team_information():
-    with open('team_info.json', 'r') as file:
-        data_dict = json.load(file)
-    colors_logos_df = pd.DataFrame(data_dict)
-    colors_logos_df = colors_logos_df[['school', 'logos']]
-    # drop rows with logos = None
-    colors_logos_df = colors_logos_df[colors_logos_df['logos'].notna()]
-    colors_logos_df['logos'] = colors_logos_df['logos'].apply(lambda x: x[0] if isinstance(x, list) else x)
-    colors_logos_df['logos'] = colors_logos_df['logos'].str.replace('http://', 'https://')
-
-    return colors_logos_df
 
+YEAR = 2024
 
 def get_schedule():
-    url = "https://api.collegefootballdata.com/calendar"
     querystring = {"year": YEAR}
-    payload = ""
-    response = requests.request("GET", url, data=payload, headers=headers, params=querystring)
-    weeks = pd.DataFrame(response.json())
+    weeks = pd.DataFrame(get_json("/calendar", querystring))
     return weeks
 
 
-def get_games():
-    url = "https://api.collegefootballdata.com/games"
-    querystring = {"year": YEAR, "week": week, "division": "fbs"}
-    payload = ""
-    response = requests.request("GET", url, data=payload, headers=headers, params=querystring)
-    games = pd.DataFrame(response.json())
-    return games
-
-
-def get_records(year):
-    url = f'https://api.collegefootballdata.com/records?year={year}'
-    response = requests.get(url, headers=headers)
-    if response.status_code == 200:
-        return response.json()
-    else:
-        raise Exception(f"Failed to fetch data. Status code: {response.status_code}")
-
-
-def create_records(valid_records):
-    if not valid_records:
-        return pd.DataFrame()
-    team_records_list = []
-    for record in valid_records:
-        team_record = {
-            'team': record['team'],  # Include teamId for merging
-            'Total Wins': record['total'].get('wins', 0),
-            'Total Losses': record['total'].get('losses', 0),
-            'Conference Wins': record['conferenceGames'].get('wins', 0),
-            'Conference Losses': record['conferenceGames'].get('losses', 0),
-        }
-        team_records_list.append(team_record)
-    return pd.DataFrame(team_records_list)
-
-
 def select_week():
     weeks_df = get_schedule()
     weeks_df['firstGameStart'] = pd.to_datetime(weeks_df['firstGameStart'])
@@ -81,106 +34,21 @@ def select_week():
     return week
 
 
-def clean_games(games_df):
-    # Step 1: Convert 'start_date' column to datetime (if it's not already in datetime format)
-    games_df['start_date'] = pd.to_datetime(games_df['start_date'], errors='coerce')
-
-    # Check for any rows where the conversion failed and handle them
-    if games_df['start_date'].isnull().any():
-        raise ValueError("There are invalid date formats in the 'start_date' column.")
-
-    # Step 2: Ensure that the 'start_date' is timezone-naive, and then localize to UTC
-    if games_df['start_date'].dt.tz is None:
-        games_df['start_date'] = games_df['start_date'].dt.tz_localize('UTC')
-
-    # Step 3: Convert the datetime from UTC to Eastern Time
-    games_df['start_date'] = games_df['start_date'].dt.tz_convert('US/Eastern')
-
-    # Step 4: Add a new column for the day of the week
-    games_df['day_of_week'] = games_df['start_date'].dt.day_name()
-
-    # Step 4: Format the datetime as 'MMM-dd HH:MM AM/PM'
-    games_df['start_date'] = games_df['start_date'].dt.strftime('%b-%d %I:%M %p')
-    games_df = games_df[['id', 'start_date', 'day_of_week', 'home_team', 'home_points', 'home_line_scores', 'away_team', 'away_points']]
-    return games_df
-
-
-def get_lines():
-    url = "https://api.collegefootballdata.com/lines"
-    querystring = {"year": YEAR, "week": week}
-    payload = ""
-    response = requests.request("GET", url, data=payload, headers=headers, params=querystring)
-    betting_lines = []
-    for game in response.json():
-        # Find the ESPN Bet line
-        espn_line = next((line for line in game['lines'] if line['provider'] == 'ESPN Bet'), None)
-        if espn_line:
-            betting_lines.append({
-                'id': game['id'],
-                'spread': espn_line['formattedSpread'],
-                'over_under': espn_line['overUnder'],
-                'home_moneyline': espn_line['homeMoneyline'],
-                'away_moneyline': espn_line['awayMoneyline'],
-            })
-    game_lines = pd.DataFrame(betting_lines)
-    return game_lines
-
-
-def get_media():
-    url = "https://api.collegefootballdata.com/games/media"
-    querystring = {"year": YEAR, "week": week}
-    payload = ""
-    response = requests.request("GET", url, data=payload, headers=headers, params=querystring)
-    media = []
-    for game in response.json():
-        # Get the media outlet for each game
-        media.append({
-            'id': game['id'],
-            'outlet': game['outlet'],
-        })
-    # If media has games with duplicate id, concatenate the outlets in one and remove the duplicate
-    media_df = pd.DataFrame(media)
-    media_df = media_df.groupby('id')['outlet'].apply(', '.join).reset_index()
-    return media_df
-
-
-def add_logos():
-    logos_df = team_information()
-    # Drop faulty Charlotte logo
-    logos_df = logos_df[logos_df['logos'] != 'http://a.espncdn.com/i/teamlogos/ncaa/500/3253.png']
-
-    # Merge logos for the home team
-    games_with_logos = games_df.merge(logos_df, left_on='home_team', right_on='school', how='left')
-    games_with_logos = games_with_logos.rename(columns={'logos': 'home_team_logo'}).drop('school', axis=1)
-
-    # Merge logos for the visiting team
-    games_with_logos = games_with_logos.merge(logos_df, left_on='away_team', right_on='school', how='left')
-    games_with_logos = games_with_logos.rename(columns={'logos': 'away_team_logo'}).drop('school', axis=1)
-    return games_with_logos
-
-
-def display_schedule(home_team, home_team_logo, home_score, away_team, away_team_logo, away_score, game_date, weekday,
-                     spread, over_under, home_moneyline, away_moneyline, outlet,
-                     home_total_wins, home_total_losses, home_conf_wins, home_conf_losses,
-                     away_total_wins, away_total_losses, away_conf_wins, away_conf_losses):
-    home_score_display = int(home_score) if not pd.isna(home_score) else ""  # Blank if NaN
-    away_score_display = int(away_score) if not pd.isna(away_score) else ""  # Blank if NaN
-
-    return f"""
+SCHEDULE_TEMPLATE = """
     <div style="display: flex; align-items: center; justify-content: space-between;">
-        <div style="text-align: center; font-size: 16px;">{weekday}<br>{game_date}</div>
+        <div style="text-align: center; font-size: 16px;">{day_of_week}<br>{start_date}</div>
         <div style="text-align: center;">
             <img src="{away_team_logo}" width="50"><br>
             <span style="font-size: 20px;"><b>{away_team}</b></span><br>
-            <span style="font-size: 18px;">{away_total_wins}-{away_total_losses}, {away_conf_wins}-{away_conf_losses}</span><br>
-            <span style="font-size: 30px; font-weight: bold;">{away_score_display}</span>  <!-- Larger score -->
+            <span style="font-size: 18px;">{away_record}</span><br>
+            <span style="font-size: 30px; font-weight: bold;">{away_score}</span>  <!-- Larger score -->
         </div>
         <div style="text-align: center; font-size: 18px;">at</div>
         <div style="text-align: center;">
             <img src="{home_team_logo}" width="50"><br>
             <span style="font-size: 20px;"><b>{home_team}</b></span><br>
-            <span style="font-size: 18px;">{home_total_wins}-{home_total_losses}, {home_conf_wins}-{home_conf_losses}</span><br>
-            <span style="font-size: 30px; font-weight: bold;">{home_score_display}</span>  <!-- Larger score -->
+            <span style="font-size: 18px;">{home_record}</span><br>
+            <span style="font-size: 30px; font-weight: bold;">{home_score}</span>  <!-- Larger score -->
         </div>
         <div style="text-align: center; font-size: 14px; margin-top: 5px;">
             <b>{spread}</b><br>{over_under} O/U<br>a:{away_moneyline} h: {home_moneyline} <br>{outlet}
@@ -190,45 +58,59 @@ def display_schedule(home_team, home_team_logo, home_score, away_team, away_team
     """
 
 
-# Main body
-week = select_week()
-games_df = get_games()
-schedule = clean_games(games_df)
+def record_column(games, side):
+    # 'W-L, CW-CL' for every game at once; blank when the team has no record
+    wins, losses = int_column(games[f'{side}_wins']), int_column(games[f'{side}_losses'])
+    conf_wins, conf_losses = int_column(games[f'{side}_conf_wins']), int_column(games[f'{side}_conf_losses'])
+    record = wins + '-' + losses + ', ' + conf_wins + '-' + conf_losses
+    return record.where(wins != '', '')
+
+
+def display_schedule(games):
+    # Format every column for the whole frame in one pass, then fill the template for all rows at once
+    formatted = pd.DataFrame({
+        'day_of_week': games['day_of_week'],
+        'start_date': games['start_date'],
+        'home_team': games['home_team'],
+        'home_team_logo': games['home_team_logo'],
+        'home_score': int_column(games['home_points']),  # Blank if NaN
+        'home_record': record_column(games, 'home'),
+        'away_team': games['away_team'],
+        'away_team_logo': games['away_team_logo'],
+        'away_score': int_column(games['away_points']),  # Blank if NaN
+        'away_record': record_column(games, 'away'),
+        'spread': games['spread'].astype('string').fillna('N/A'),
+        'over_under': games['over_under'].astype('string').fillna('N/A'),
+        'home_moneyline': int_column(games['home_moneyline']).replace('', 'N/A'),
+        'away_moneyline': int_column(games['away_moneyline']).replace('', 'N/A'),
+        'outlet': games['outlet'],
+    })
+    return ''.join(render_template(SCHEDULE_TEMPLATE, formatted))
 
-games_with_logos = add_logos() # Add team logos
-media_df = get_media() # Add media outlet
 
-betting_df = get_lines() # Add betting info
-if not betting_df.empty:
-    games_with_betting = games_with_logos.merge(betting_df, on='id', how='left')
-    games_with_media = games_with_betting.merge(media_df, on='id', how='left')
+# Main body
+week = select_week()
+season_mode = st.sidebar.toggle("Whole season", help="Load the season once, then switch weeks and filter by team or conference without refetching")
+if season_mode:
+    # One fetch per season; switching weeks or filters below only slices it in memory
+    season = get_season(YEAR)
+    team = st.sidebar.selectbox("Team", ['All teams'] + season['teams'])
+    conference = st.sidebar.selectbox("Conference", ['All conferences'] + season['conferences'])
+    team = None if team == 'All teams' else team
+    conference = None if conference == 'All conferences' else conference
+    # A team's schedule covers the whole season; otherwise show the selected week
+    games = season_game_cards(YEAR, week=None if team else week, team=team, conference=conference)
+    title = f"{team} {YEAR} CFB Schedule" if team else f"Week {week} CFB Schedule"
 else:
-    games_with_media = games_with_logos.merge(media_df, on='id', how='left')
-    games_with_media['spread'] = 'N/A'
-    games_with_media['over_under'] = 'N/A'
-    games_with_media['home_moneyline'] = 'N/A'
-    games_with_media['away_moneyline'] = 'N/A'
-
-records = create_records(get_records(YEAR)) # Add team records
-games_with_records = games_with_media.merge(records, left_on='home_team', right_on='team', how='left', suffixes=('', '_home'))
-games_with_records = games_with_records.merge(records, left_on='away_team', right_on='team', how='left', suffixes=('', '_away'))
-
-st.header(f"Week {week} CFB Schedule", divider='blue')
-for index, row in games_with_records.iterrows():
-    st.markdown(display_schedule(
-        row['home_team'],  # Home team name
-        row['home_team_logo'],  # Home team logo
-        row['home_points'],  # Home team score
-        row['away_team'],  # Away team name
-        row['away_team_logo'],  # Away team logo
-        row['away_points'],  # Away team score
-        row['start_date'],  # Game date
-        row['day_of_week'],  # Day of the week
-        row['spread'],  # Spread
-        row['over_under'],  # Over/Under
-        row['home_moneyline'],  # Home team moneyline
-        row['away_moneyline'],  # Away team moneyline
-        row['outlet'],  # Media outlet
-        row['Total Wins'], row['Total Losses'], row['Conference Wins'], row['Conference Losses'],  # Home team records
-        row['Total Wins_away'], row['Total Losses_away'], row['Conference Wins_away'], row['Conference Losses_away'], # Away team records
-    ), unsafe_allow_html=True)
\ No newline at end of file
+    # Built once per week from concurrent fetches; past weeks are never rebuilt
+    games = week_game_cards(YEAR, week)
+    title = f"Week {week} CFB Schedule"
+
+st.header(title, divider='blue')
+# Optional paging by day; only the visible games are rendered, as a single markdown element
+days = list(games['day_of_week'].dropna().unique())
+selected_day = st.sidebar.selectbox("Select day", ['All days'] + days)
+if selected_day != 'All days':
+    games = games[games['day_of_week'] == selected_day]
+st.markdown(display_schedule(games), unsafe_allow_html=True)
+metrics.rerun_finished()
@@ -1,21 +1,17 @@
-import json
 from datetime import datetime
 import streamlit as st
 import pandas as pd
-import requests
-from config_api import headers
+from cfbd_client import get_json
+from team_directory import get_team, team_names
+import metrics
+
+metrics.rerun_started('statistics')
 
 
 def team_information():
-    with open('team_info.json', 'r') as file:
-        data_dict = json.load(file)
-    team_df = pd.DataFrame(data_dict)
-    for school in team_df['school']:
-        if school == team:
-            # set team_color = color for school = team
-            team_color = team_df[team_df['school'] == team]['color'].values[0]
-            team_logo = team_df[team_df['school'] == team]['logos'].values[0][0]
-            return team_color, team_logo
+    team_info = get_team(team)
+    if team_info:
+        return team_info['color'], team_info['logo']
 
 
 def select_team_year():
@@ -24,11 +20,8 @@ def select_team_year():
                                    max_value=datetime.now().year + 1,
                                    step=1,
                                    value=2024)
-    # Load the JSON data from the uploaded file
-    with open('team_info.json') as f:
-        team_data = json.load(f)
-    # Filter teams with classification "fbs" or "fcs"
-    filtered_teams = sorted([team['school'] for team in team_data if team['classification'] in ['fbs']])
+    # Team names with classification "fbs"
+    filtered_teams = team_names(include_fcs=False)
     team_index = filtered_teams.index(st.session_state.team)
     team = st.sidebar.selectbox('Select Team Name', options=filtered_teams, index=team_index)
     st.session_state.team = team
@@ -37,11 +30,8 @@ def select_team_year():
 
 
 def get_stats():
-    url = "https://api.collegefootballdata.com/stats/player/season"
     querystring = {"team":team,"year":year}
-    payload = ""
-    response = requests.request("GET", url, data=payload, headers=headers, params=querystring)
-    stats_df = pd.DataFrame(response.json())
+    stats_df = pd.DataFrame(get_json("/stats/player/season", querystring))
     # Convert stats_df['stat'] into a float from a string
     stats_df['stat'] = stats_df['stat'].astype(float)
     # Sort stats_df on 'category' and 'statType'
@@ -88,4 +78,5 @@ st.markdown(f"""
     """, unsafe_allow_html=True)
 
 stats_df = get_stats()
-display_stats()
\ No newline at end of file
+display_stats()
+metrics.rerun_finished()
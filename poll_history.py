@@ -0,0 +1,85 @@
+import time
+import pandas as pd
+import metrics
+from cfbd_client import get_json
+from season_memo import SeasonMemo
+
+RANKING_COLUMNS = ['season_type', 'week', 'poll', 'rank', 'school', 'conference', 'first_place_votes', 'points']
+
+@metrics.timed
+def create_rankings(rankings):
+    """Flatten a season of /rankings JSON into one row per (poll, week, team).
+
+    Postseason polls are numbered as the week after the last regular-season week, so every poll
+    sits on one week axis.
+    """
+    columns = {column: [] for column in RANKING_COLUMNS}
+    last_regular_week = max((entry['week'] for entry in rankings if entry.get('seasonType') == 'regular'), default=0)
+    for entry in rankings:
+        season_type = entry.get('seasonType', 'regular')
+        week = entry['week'] if season_type == 'regular' else last_regular_week + entry['week']
+        for poll in entry['polls']:
+            ranks = poll['ranks']
+            count = len(ranks)
+            columns['season_type'].extend([season_type] * count)
+            columns['week'].extend([week] * count)
+            columns['poll'].extend([poll['poll']] * count)
+            columns['rank'].extend([rank['rank'] for rank in ranks])
+            columns['school'].extend([rank['school'] for rank in ranks])
+            columns['conference'].extend([rank.get('conference') for rank in ranks])
+            columns['first_place_votes'].extend([rank.get('firstPlaceVotes') or 0 for rank in ranks])
+            columns['points'].extend([rank.get('points') or 0 for rank in ranks])
+
+    rankings_df = pd.DataFrame(columns)
+    for column in ['season_type', 'poll', 'conference']:
+        rankings_df[column] = rankings_df[column].astype('category')
+    return add_movement(rankings_df).set_index(['poll', 'week', 'school']).sort_index()
+
+
+def add_movement(rankings_df):
+    # Places gained since the team's previous appearance in the same poll; NaN when newly ranked
+    rankings_df = rankings_df.sort_values(['poll', 'school', 'week'])
+    by_team = rankings_df.groupby(['poll', 'school'], observed=True)
+    previous_week = by_team['week'].shift()
+    previous_rank = by_team['rank'].shift()
+    # Dropping out and coming back counts as newly ranked
+    previous_rank = previous_rank.where(rankings_df['week'] - previous_week == 1)
+    return rankings_df.assign(movement=previous_rank - rankings_df['rank'])
+
+
+def build_season(year):
+    rankings_df = create_rankings(get_json('/rankings', {'year': year}, stale_ok=False))
+    return {
+        'rankings': rankings_df,
+        'weeks': sorted(rankings_df.index.unique('week')),
+        'polls': list(rankings_df.index.unique('poll')),
+        'built': time.time(),
+    }
+
+
+_seasons = SeasonMemo(lambda year, previous: build_season(year))
+
+
+def get_season(year):
+    return _seasons.get(year)
+
+
+def week_polls(year, week):
+    """Every poll released for one week, as {poll: ranks in order}; a local slice of the season."""
+    rankings_df = get_season(year)['rankings']
+    if week not in rankings_df.index.unique('week'):
+        return {}
+    week_df = rankings_df.xs(week, level='week')
+    return {poll: ranks.reset_index().sort_values('rank').reset_index(drop=True)
+            for poll, ranks in week_df.groupby(level='poll', observed=True, sort=False)}
+
+
+def ranked_teams(year, poll):
+    return sorted(get_season(year)['rankings'].loc[poll].index.unique('school'))
+
+
+def rank_trajectories(year, poll, teams):
+    """Week-by-week rank, movement, first-place votes and points in one poll for the given teams."""
+    trajectory = get_season(year)['rankings'].loc[poll].reset_index()
+    trajectory = trajectory[trajectory['school'].isin(teams)]
+    return trajectory[['week', 'school', 'rank', 'movement', 'first_place_votes', 'points']].reset_index(drop=True)
@@ -0,0 +1,201 @@
+"""Opt-in sampling profile of a page rerun, including the pool threads working for it.
+
+Add ?profile=1 to any page's URL, or set CFBD_PROFILE=1 to profile every rerun of every page.
+A sampler thread reads the stacks of the rerun's script thread, and of pool threads while they
+run tasks it submitted, every CFBD_PROFILE_INTERVAL seconds. It installs no tracing hooks and
+records only the rerun's own threads, so other sessions are not mixed in. Reading the stacks takes
+the GIL, though, which adds contention process-wide while a profiled rerun is active. The profile
+appears at the bottom of the page, with the samples as collapsed stacks for flamegraph.pl,
+speedscope or inferno. When profiling is off, a rerun costs one query parameter lookup and
+pool tasks run unwrapped.
+"""
+import collections
+import contextvars
+import os
+import sys
+import threading
+import time
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+PROFILE_ALL = bool(os.environ.get('CFBD_PROFILE'))
+INTERVAL = float(os.environ.get('CFBD_PROFILE_INTERVAL', 0.005))
+# A sampler whose rerun never finished (st.stop, a closed tab) gives up after this many seconds
+MAX_SECONDS = 120
+APP_ROOT = os.path.dirname(os.path.abspath(__file__)).replace(os.sep, '/')
+# Rows shown on the page; the download has everything
+TOP = 40
+
+# The profile of the rerun running on this thread, if any; cfbd_client.submit carries it to pool threads
+_active = contextvars.ContextVar('cfbd_profile', default=None)
+
+
+class RerunProfile:
+    """Stack samples of one rerun's script thread and of the pool threads while they work for it."""
+
+    def __init__(self, page):
+        self.page = page
+        self.start = time.perf_counter()
+        self.threads = {threading.get_ident()}
+        self.lock = threading.Lock()
+        # (frame, ...) from the outermost call to the sampled one -> samples
+        self.stacks = collections.Counter()
+        self.ticks = 0
+        self.stopped = threading.Event()
+        self.sampler = threading.Thread(target=self.sample, name=f'profiler-{page}', daemon=True)
+        self.sampler.start()
+
+    def sample(self):
+        while not self.stopped.wait(INTERVAL) and time.perf_counter() - self.start < MAX_SECONDS:
+            frames = sys._current_frames()
+            with self.lock:
+                threads = list(self.threads)
+            for ident in threads:
+                if ident in frames:
+                    self.stacks[stack(frames[ident])] += 1
+            self.ticks += 1
+
+    def add_thread(self, ident):
+        with self.lock:
+            self.threads.add(ident)
+
+    def remove_thread(self, ident):
+        with self.lock:
+            self.threads.discard(ident)
+
+    def close(self):
+        self.stopped.set()
+        self.sampler.join()
+
+
+def stack(frame):
+    # (filename, first line, function) per frame, outermost first
+    frames = []
+    while frame is not None:
+        code = frame.f_code
+        frames.append((code.co_filename, code.co_firstlineno, code.co_name))
+        frame = frame.f_back
+    return tuple(reversed(frames))
+
+
+def requested():
+    if PROFILE_ALL:
+        return True
+    if get_script_run_ctx() is None:
+        return False
+    return 'profile' in st.query_params
+
+
+def start(page):
+    """Start sampling this rerun of `page` if asked to; returns whether it did."""
+    leftover = _active.get()
+    if leftover is not None:
+        # The previous rerun stopped early (st.rerun, st.stop or an exception) and never finished
+        leftover.close()
+        _active.set(None)
+    if not requested():
+        return False
+    _active.set(RerunProfile(page))
+    return True
+
+
+def attach(fn):
+    """Wrap `fn` so a pool thread running it is sampled as part of the submitting rerun, if that is profiled."""
+    rerun = _active.get()
+    if rerun is None:
+        return fn
+
+    def run(*args, **kwargs):
+        token = _active.set(rerun)
+        ident = threading.get_ident()
+        rerun.add_thread(ident)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            rerun.remove_thread(ident)
+            _active.reset(token)
+
+    return run
+
+
+def area(filename):
+    # Coarse bucket for the frame a sample landed in: this app, a third-party package, the standard
+    # library, network I/O or waiting on pool threads
+    path = filename.replace(os.sep, '/')
+    if '/site-packages/' in path:
+        package = path.split('/site-packages/', 1)[1]
+        if package.startswith('pandas/io/formats/style'):
+            return 'pandas Styler'
+        if package.startswith(('urllib3/', 'requests/')):
+            return 'network'
+        return package.split('/', 1)[0]
+    if path.startswith(APP_ROOT + '/'):
+        return 'app'
+    if path.endswith(('/socket.py', '/ssl.py', '/http/client.py')):
+        return 'network'
+    if path.endswith('/threading.py') or '/concurrent/futures/' in path:
+        return 'waiting on workers'
+    return 'stdlib'
+
+
+def location(filename, line):
+    # Short enough to read: relative to the app, the package or just the stdlib module
+    path = filename.replace(os.sep, '/')
+    if '/site-packages/' in path:
+        path = path.split('/site-packages/', 1)[1]
+    elif path.startswith(APP_ROOT + '/'):
+        path = path[len(APP_ROOT) + 1:]
+    else:
+        path = os.path.basename(path)
+    return f'{path}:{line}'
+
+
+def function_frame(stacks, seconds_per_sample):
+    """One row per sampled function: area, name, location, own and inclusive seconds."""
+    own, inclusive = collections.Counter(), collections.Counter()
+    for frames, samples in stacks.items():
+        own[frames[-1]] += samples
+        for frame in set(frames):
+            inclusive[frame] += samples
+    rows = [{
+        'Area': area(filename),
+        'Function': function,
+        'Location': location(filename, line),
+        'Own s': own[(filename, line, function)] * seconds_per_sample,
+        'Inclusive s': samples * seconds_per_sample,
+    } for (filename, line, function), samples in inclusive.items()]
+    return pd.DataFrame(rows, columns=['Area', 'Function', 'Location', 'Own s', 'Inclusive s'])
+
+
+def collapsed_stacks(stacks):
+    """The samples as 'outer;...;inner count' lines, the input format of most flame graph tools."""
+    return '\n'.join(
+        ';'.join(f'{function} ({location(filename, line)})' for filename, line, function in frames) + f' {samples}'
+        for frames, samples in stacks.items()) + '\n'
+
+
+def finish():
+    """Stop sampling this rerun and show the result; returns False if the rerun was not profiled."""
+    rerun = _active.get()
+    if rerun is None:
+        return False
+    _active.set(None)
+    elapsed = time.perf_counter() - rerun.start
+    rerun.close()
+    # Each tick samples every thread working for the rerun once
+    frame = function_frame(rerun.stacks, elapsed / rerun.ticks if rerun.ticks else 0)
+    with st.expander(f"Profile of this rerun: {elapsed:.2f}s, {rerun.ticks} samples", expanded=True):
+        st.caption("Pool thread time is included, so totals can exceed the rerun's wall time.")
+        st.markdown("##### Own time by area")
+        by_area = frame.groupby('Area')['Own s'].sum().sort_values(ascending=False).round(3)
+        st.dataframe(by_area.reset_index(), hide_index=True, use_container_width=True)
+        st.markdown("##### App functions by inclusive time")
+        app = frame[frame['Area'] == 'app'].sort_values('Inclusive s', ascending=False).head(TOP)
+        st.dataframe(app.drop(columns='Area').round(3), hide_index=True, use_container_width=True)
+        st.markdown("##### Everything by own time")
+        st.dataframe(frame.sort_values('Own s', ascending=False).head(TOP).round(3),
+                     hide_index=True, use_container_width=True)
+        st.download_button("Download flame graph data (collapsed stacks)", collapsed_stacks(rerun.stacks),
+                           file_name=f'{rerun.page}-profile.txt', mime='text/plain')
+    return True
@@ -0,0 +1,182 @@
+import atexit
+import collections
+import contextvars
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+import requests
+from atomic_files import atomic_write_json
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+# Upstream call budgets; 0 means no limit
+PER_MINUTE = int(os.environ.get('CFBD_QUOTA_PER_MINUTE', 0))
+PER_MONTH = int(os.environ.get('CFBD_QUOTA_PER_MONTH', 0))
+# Share of a budget after which only essential calls go upstream and stale cache entries are served as is
+SOFT_LIMIT = float(os.environ.get('CFBD_QUOTA_SOFT_LIMIT', 0.9))
+# The month's count survives restarts
+QUOTA_PATH = os.environ.get('CFBD_QUOTA_PATH', '.cache/quota.json')
+# It is written after this many calls or seconds, whichever comes first, and on exit
+SAVE_EVERY = 20
+SAVE_INTERVAL = 30
+# Sessions kept in calls_by_session; the least recently active are dropped
+MAX_SESSIONS = 500
+
+# Upstream calls by page script and by browser session (cfbd_client.upstream_calls has them by endpoint)
+calls_by_page = collections.Counter()
+calls_by_session = collections.OrderedDict()
+
+_lock = threading.Lock()
+_save_lock = threading.Lock()
+_minute = collections.deque()
+_month = None
+_unsaved = 0
+_saved_at = 0.0
+# Who a call made on a worker thread is made for (see attach)
+_caller = contextvars.ContextVar('caller', default=('background', None))
+
+
+class QuotaExceededError(requests.exceptions.RequestException):
+    """Raised instead of calling upstream when the call budget is used up."""
+
+
+def current_caller():
+    """(page, session id) of the script run making the call, or the caller attached to this thread."""
+    ctx = get_script_run_ctx(suppress_warning=True)
+    if ctx is None:
+        return _caller.get()
+    page = ctx.pages_manager.get_pages().get(ctx.page_script_hash, {})
+    script = page.get('script_path') or ctx.main_script_path
+    return os.path.splitext(os.path.basename(script))[0], ctx.session_id
+
+
+def attach(fn):
+    """Wrap `fn` so calls it makes on another thread are still counted against the submitting page and session."""
+    caller = current_caller()
+
+    def run(*args, **kwargs):
+        token = _caller.set(caller)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _caller.reset(token)
+
+    return run
+
+
+def this_month():
+    return datetime.now(timezone.utc).strftime('%Y-%m')
+
+
+def load_month():
+    try:
+        with open(QUOTA_PATH, 'r', encoding='utf-8') as file:
+            month = json.load(file)
+        if month['month'] == this_month():
+            return month
+    except (OSError, ValueError, KeyError):
+        pass
+    return {'month': this_month(), 'calls': 0}
+
+
+def persist(force=False):
+    """Write the month's count if enough calls or time have gone by since the last write (or if `force`)."""
+    global _unsaved, _saved_at
+    with _lock:
+        if _month is None or not _unsaved:
+            return
+        if not force and _unsaved < SAVE_EVERY and time.time() - _saved_at < SAVE_INTERVAL:
+            return
+        month = dict(_month)
+        _unsaved, _saved_at = 0, time.time()
+    # Outside _lock, so calls are not held up by the disk
+    with _save_lock:
+        atomic_write_json(QUOTA_PATH, month)
+
+
+atexit.register(persist, True)
+
+
+def count(page, session, calls):
+    # Callers hold _lock
+    global _unsaved
+    _month['calls'] += calls
+    _unsaved += 1
+    calls_by_page[page] += calls
+    calls_by_session[session] = calls_by_session.get(session, 0) + calls
+    calls_by_session.move_to_end(session)
+    while len(calls_by_session) > MAX_SESSIONS:
+        calls_by_session.popitem(last=False)
+
+
+def _usage():
+    # Callers hold _lock
+    global _month
+    now = time.time()
+    while _minute and now - _minute[0] >= 60:
+        _minute.popleft()
+    if _month is None or _month['month'] != this_month():
+        _month = load_month()
+    return len(_minute), _month['calls']
+
+
+def share(minute, month):
+    # The larger of the minute and month budget shares (0 when unlimited)
+    return max(minute / PER_MINUTE if PER_MINUTE else 0, month / PER_MONTH if PER_MONTH else 0)
+
+
+def used_share():
+    with _lock:
+        return share(*_usage())
+
+
+def is_degraded():
+    return used_share() >= SOFT_LIMIT
+
+
+def acquire(endpoint, essential=True):
+    """Count one upstream call, or raise QuotaExceededError if the budget does not allow it.
+
+    Non-essential calls are refused from the soft limit on, so the rest of the budget goes to the
+    calls pages cannot do without.
+    """
+    page, session = current_caller()
+    with _lock:
+        minute, month = _usage()
+        if PER_MINUTE and minute >= PER_MINUTE:
+            raise QuotaExceededError(f'API budget of {PER_MINUTE} calls per minute used up')
+        if PER_MONTH and month >= PER_MONTH:
+            raise QuotaExceededError(f'API budget of {PER_MONTH} calls this month used up')
+        used = share(minute, month)
+        if not essential and used >= SOFT_LIMIT:
+            raise QuotaExceededError(f'{endpoint} skipped to save API budget ({used:.0%} used)')
+        _minute.append(time.time())
+        count(page, session, 1)
+    persist()
+
+
+def refund():
+    """Give back the call counted by the last acquire on this thread, when it was not made after all."""
+    page, session = current_caller()
+    with _lock:
+        _usage()
+        if _minute:
+            _minute.pop()
+        count(page, session, -1)
+    persist()
+
+
+def usage():
+    """Counters and budget use, for the metrics page."""
+    with _lock:
+        minute, month = _usage()
+        return {
+            'used': share(minute, month),
+            'minute': minute,
+            'per_minute': PER_MINUTE,
+            'month': month,
+            'per_month': PER_MONTH,
+            'by_page': dict(calls_by_page),
+            'by_session': dict(calls_by_session),
+        }
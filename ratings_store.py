@@ -0,0 +1,88 @@
+import time
+import pandas as pd
+import response_cache
+from cfbd_client import fetch_concurrently, submit
+from quota import QuotaExceededError
+from season_memo import SeasonMemo
+from season_records import get_season_records
+
+# Display column -> (endpoint, field holding the rating)
+RATING_ENDPOINTS = {
+    'FPI': ('/ratings/fpi', 'fpi'),
+    'ELO': ('/ratings/elo', 'elo'),
+    'SRS': ('/ratings/srs', 'rating'),
+    'SP': ('/ratings/sp', 'rating'),
+}
+
+# Seconds before a season with ratings skipped for the API budget is rebuilt
+SKIPPED_RETRY = 60
+
+def team_series(payload, field):
+    # One value per team; the SP+ payload also carries a 'nationalAverages' row without a team
+    frame = pd.DataFrame(payload)
+    if frame.empty or field not in frame:
+        return pd.Series(dtype=float)
+    frame = frame[frame['team'].notna()].drop_duplicates('team', keep='last')
+    return frame.set_index('team')[field]
+
+
+def build_season(year):
+    """Pull every rating system and /stats/season once for all teams in a season."""
+    query = {'year': year}
+    # Near the API budget cap the ratings are dropped first; the stats and records are kept
+    futures = fetch_concurrently({name: (endpoint, query) for name, (endpoint, field) in RATING_ENDPOINTS.items()},
+                                 essential=False, stale_ok=False)
+    futures.update(fetch_concurrently({'stats': ('/stats/season', query)}, stale_ok=False))
+    records_future = submit(get_season_records, year)
+
+    columns = {}
+    skipped = []
+    for name, (endpoint, field) in RATING_ENDPOINTS.items():
+        try:
+            columns[name] = team_series(futures[name].result(), field)
+        except QuotaExceededError:
+            columns[name] = pd.Series(dtype=float)
+            skipped.append(name)
+    columns['games_played'] = records_future.result().set_index('team')['Total Games'].astype(float)
+    ratings = pd.DataFrame(columns)
+
+    stats = futures['stats'].result()
+    stats = pd.DataFrame(stats, columns=['team', 'statName', 'statValue'])
+    stats = stats.sort_values(['team', 'statName']).set_index('team')
+    return {'ratings': ratings, 'stats': stats, 'skipped': skipped, 'built': time.time()}
+
+
+def is_fresh(year, season):
+    # Completed seasons are built once; the current season is rebuilt once the response cache TTL lapses,
+    # and a season missing ratings skipped for the API budget is retried after SKIPPED_RETRY
+    if season['skipped'] and time.time() - season['built'] > SKIPPED_RETRY:
+        return False
+    return response_cache.is_fresh(year, season['built'])
+
+
+_seasons = SeasonMemo(lambda year, previous: build_season(year), is_fresh)
+
+
+def get_season(year):
+    return _seasons.get(year)
+
+
+def team_ratings(year, team):
+    ratings = get_season(year)['ratings']
+    return ratings.reindex([team])[list(RATING_ENDPOINTS)]
+
+
+def skipped_ratings(year):
+    return get_season(year)['skipped']
+
+
+def games_played(year, team):
+    games = get_season(year)['ratings']['games_played'].get(team)
+    return None if pd.isna(games) else int(games)
+
+
+def team_season_stats(year, team):
+    stats = get_season(year)['stats']
+    if team not in stats.index:
+        return pd.DataFrame(columns=['statName', 'statValue'])
+    return stats.loc[[team]].reset_index(drop=True)
@@ -0,0 +1,66 @@
+import hashlib
+import json
+import os
+import time
+from datetime import date
+from atomic_files import atomic_write_json
+
+# Where cached responses live and how long current-season responses stay fresh (seconds)
+CACHE_DIR = os.environ.get('CFBD_CACHE_DIR', '.cache/cfbd')
+CURRENT_SEASON_TTL = int(os.environ.get('CFBD_CACHE_TTL', 300))
+
+
+def current_season():
+    # Bowl games run into January, so a new season only starts once February begins
+    today = date.today()
+    return today.year if today.month >= 2 else today.year - 1
+
+
+def cache_key(endpoint, params=None):
+    # Same endpoint + same query (regardless of order or int/str year) -> same key
+    normalized = sorted((str(key), str(value)) for key, value in (params or {}).items() if value is not None)
+    return hashlib.sha1(json.dumps([endpoint, normalized]).encode('utf-8')).hexdigest()
+
+
+def is_immutable(params=None):
+    """Completed seasons never change, so their responses never expire."""
+    try:
+        return int((params or {}).get('year')) < current_season()
+    except (TypeError, ValueError):
+        return False
+
+
+def is_fresh(year, built):
+    """Whether a season-level structure built at `built` (epoch seconds) can still be served."""
+    return is_immutable({'year': year}) or time.time() - built < CURRENT_SEASON_TTL
+
+
+def cache_path(endpoint, params=None):
+    return os.path.join(CACHE_DIR, f'{cache_key(endpoint, params)}.json')
+
+
+def lookup(endpoint, params=None):
+    """Return (payload, fresh) for this request, expired entries included, or None if never cached."""
+    try:
+        with open(cache_path(endpoint, params), 'r', encoding='utf-8') as file:
+            entry = json.load(file)
+    except (OSError, ValueError):
+        return None
+    return entry['payload'], is_immutable(params) or time.time() - entry['fetched'] < CURRENT_SEASON_TTL
+
+
+def get(endpoint, params=None):
+    """Return the cached payload for this request, or None if missing or expired."""
+    entry = lookup(endpoint, params)
+    if entry is None or not entry[1]:
+        return None
+    return entry[0]
+
+
+def envelope(endpoint, params, payload):
+    # What a cache entry (or a recorded fixture, see backends.py) holds
+    return {'endpoint': endpoint, 'params': params, 'fetched': time.time(), 'payload': payload}
+
+
+def put(endpoint, params, payload):
+    atomic_write_json(cache_path(endpoint, params), envelope(endpoint, params, payload))
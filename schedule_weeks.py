@@ -0,0 +1,222 @@
+import hashlib
+import json
+import os
+import time
+from datetime import datetime, timedelta, timezone
+import pandas as pd
+import metrics
+import response_cache
+import season_memo
+from cfbd_client import fetch_concurrently, get_json, submit
+from season_memo import SeasonMemo
+from season_records import get_season_records
+from team_directory import team_attribute
+
+# How long a built week is served before its inputs are checked again (seconds); past weeks are never rebuilt
+CURRENT_WEEK_TTL = response_cache.CURRENT_SEASON_TTL
+FUTURE_WEEK_TTL = int(os.environ.get('CFBD_FUTURE_WEEK_TTL', 60 * 60))
+# A week is past once its last kickoff is this far behind us and every score is final
+FINAL_AFTER = timedelta(hours=12)
+# ... or once it is this far behind us regardless, so a cancelled game does not keep a week open forever
+UNFINISHED_AFTER = timedelta(days=7)
+# Lines shown on the schedule come from this sportsbook
+LINE_PROVIDER = 'ESPN Bet'
+
+# /games field -> column used by the schedule page (older responses are already snake_case)
+GAME_COLUMNS = {
+    'startDate': 'start_date',
+    'homeTeam': 'home_team',
+    'homePoints': 'home_points',
+    'awayTeam': 'away_team',
+    'awayPoints': 'away_points',
+    'homeConference': 'home_conference',
+    'awayConference': 'away_conference',
+}
+GAME_FIELDS = ['id', 'week', 'start_date', 'home_team', 'home_conference', 'home_points',
+               'away_team', 'away_conference', 'away_points']
+# Season record column -> game card column suffix
+RECORD_COLUMNS = {
+    'Total Wins': 'wins',
+    'Total Losses': 'losses',
+    'Conference Wins': 'conf_wins',
+    'Conference Losses': 'conf_losses',
+}
+
+
+def week_window(year, week):
+    # First and last kickoff of a regular-season week, from the (cached) season calendar
+    for entry in get_json('/calendar', {'year': year}):
+        if entry['week'] == week and entry.get('seasonType', 'regular') == 'regular':
+            return (datetime.fromisoformat(entry['firstGameStart'].replace('Z', '+00:00')),
+                    datetime.fromisoformat(entry['lastGameStart'].replace('Z', '+00:00')))
+    return None
+
+
+def week_status(year, window, all_final=True, now=None):
+    """'past', 'current' or 'future' for a week with kickoff window `window`.
+
+    all_final: whether every game of the week has a final score; a late or postponed game keeps
+    the week current.
+    """
+    if response_cache.is_immutable({'year': year}):
+        return 'past'
+    if window is None:
+        return 'current'
+    now = now or datetime.now(timezone.utc)
+    first_kickoff, last_kickoff = window
+    if (all_final and now > last_kickoff + FINAL_AFTER) or now > last_kickoff + UNFINISHED_AFTER:
+        return 'past'
+    if now < first_kickoff - timedelta(days=1):
+        return 'future'
+    return 'current'
+
+
+def create_games(games):
+    games_df = pd.DataFrame(games).rename(columns=GAME_COLUMNS)
+    games_df = games_df.reindex(columns=GAME_FIELDS)
+    # Kickoffs are UTC; the schedule shows them in Eastern time
+    start = pd.to_datetime(games_df['start_date'], utc=True).dt.tz_convert('US/Eastern')
+    games_df['day_of_week'] = start.dt.day_name()
+    games_df['start_date'] = start.dt.strftime('%b-%d %I:%M %p')
+    return games_df
+
+
+def create_lines(lines):
+    betting_lines = []
+    for game in lines:
+        line = next((line for line in game['lines'] if line['provider'] == LINE_PROVIDER), None)
+        if line:
+            betting_lines.append({
+                'id': game['id'],
+                'spread': line['formattedSpread'],
+                'over_under': line['overUnder'],
+                'home_moneyline': line['homeMoneyline'],
+                'away_moneyline': line['awayMoneyline'],
+            })
+    return pd.DataFrame(betting_lines, columns=['id', 'spread', 'over_under', 'home_moneyline', 'away_moneyline'])
+
+
+def create_media(media):
+    # A game on several outlets is listed once with the outlets joined
+    media_df = pd.DataFrame(media, columns=['id', 'outlet'])
+    return media_df.groupby('id')['outlet'].apply(', '.join).reset_index()
+
+
+@metrics.timed
+def create_game_cards(games, lines, media, records):
+    """One row per game with everything the schedule page renders: kickoff, teams, logos, scores,
+    both teams' records, the line and the TV outlet."""
+    cards = create_games(games)
+    cards = cards.merge(create_lines(lines), on='id', how='left').merge(create_media(media), on='id', how='left')
+    records = records.drop_duplicates('team').set_index('team')
+    for side in ('home', 'away'):
+        teams = cards[f'{side}_team']
+        cards[f'{side}_team_logo'] = team_attribute(teams, 'logo')
+        for column, suffix in RECORD_COLUMNS.items():
+            cards[f'{side}_{suffix}'] = teams.map(records[column])
+    return cards
+
+
+def fingerprint(*inputs):
+    # Changes whenever any upstream payload (or the season records) changes
+    digest = hashlib.sha1()
+    for value in inputs:
+        if isinstance(value, pd.DataFrame):
+            digest.update(pd.util.hash_pandas_object(value, index=False).values.tobytes())
+        else:
+            digest.update(json.dumps(value, sort_keys=True, default=str).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def fetch_inputs(query):
+    # /games, /lines and /games/media for `query` plus the season records, fetched concurrently.
+    # Not stale copies: an unchanged fingerprint re-stamps the cards as checked for another TTL
+    futures = fetch_concurrently({
+        'games': ('/games', dict(query, division='fbs')),
+        'lines': ('/lines', query),
+        'media': ('/games/media', query),
+    }, stale_ok=False)
+    records_future = submit(get_season_records, query['year'])
+    games, lines, media = (futures[name].result() for name in ('games', 'lines', 'media'))
+    records = records_future.result()[['team'] + list(RECORD_COLUMNS)]
+    return games, lines, media, records
+
+
+def build_cards(inputs, previous):
+    # Rebuild only if an input changed since `previous` was built
+    key = fingerprint(*inputs)
+    if previous is not None and previous['fingerprint'] == key:
+        return previous['cards'], key
+    return create_game_cards(*inputs), key
+
+
+def build_week(year, week, previous=None):
+    """Fetch a week's games, lines and media (and the season's records) concurrently and build its game cards.
+
+    If none of the inputs changed since `previous` was built, `previous` is kept and only re-stamped.
+    """
+    window_future = submit(week_window, year, week)
+    cards, key = build_cards(fetch_inputs({'year': year, 'week': week}), previous)
+    return {'cards': cards, 'fingerprint': key, 'window': window_future.result(), 'checked': time.time()}
+
+
+def build_season(year, previous=None):
+    """Game cards for a whole season from one /games, /lines and /games/media fetch, indexed by week."""
+    cards, key = build_cards(fetch_inputs({'year': year}), previous)
+    if previous is not None and previous['cards'] is cards:
+        return dict(previous, checked=time.time())
+    conferences = pd.concat([cards['home_conference'], cards['away_conference']]).dropna()
+    teams = pd.concat([cards['home_team'], cards['away_team']]).dropna()
+    return {
+        'cards': cards,
+        'by_week': dict(tuple(cards.groupby('week'))),
+        'teams': sorted(teams.unique()),
+        'conferences': sorted(conferences.unique()),
+        'fingerprint': key,
+        'checked': time.time(),
+    }
+
+
+def is_fresh(year, entry):
+    scores = entry['cards'][['home_points', 'away_points']]
+    status = week_status(year, entry['window'], all_final=bool(scores.notna().all(axis=None)))
+    if status == 'past':
+        return True
+    ttl = CURRENT_WEEK_TTL if status == 'current' else FUTURE_WEEK_TTL
+    return time.time() - entry['checked'] < ttl
+
+
+# A few seasons' worth of weeks
+_weeks = SeasonMemo(lambda key, previous: build_week(*key, previous), lambda key, entry: is_fresh(key[0], entry),
+                    max_entries=20 * season_memo.MAX_SEASONS)
+
+
+def get_week(year, week):
+    return _weeks.get((year, week))
+
+
+def week_game_cards(year, week):
+    """The materialized game cards for one week of a season."""
+    return get_week(year, week)['cards']
+
+
+_seasons = SeasonMemo(build_season, lambda year, season: response_cache.is_fresh(year, season['checked']))
+
+
+def get_season(year):
+    """The whole season's game cards (see build_season); completed seasons are built once."""
+    return _seasons.get(year)
+
+
+def season_game_cards(year, week=None, team=None, conference=None):
+    """Filter a season's game cards in memory: one week, one team's games, or games involving a conference."""
+    season = get_season(year)
+    if week is not None:
+        cards = season['by_week'].get(week, season['cards'].iloc[0:0])
+    else:
+        cards = season['cards']
+    if team is not None:
+        cards = cards[(cards['home_team'] == team) | (cards['away_team'] == team)]
+    if conference is not None:
+        cards = cards[(cards['home_conference'] == conference) | (cards['away_conference'] == conference)]
+    return cards
@@ -0,0 +1,134 @@
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime, timezone
+from types import MappingProxyType
+import requests
+from cfbd_client import get_json
+from scoreboard_render import render_live_games
+
+# Seconds between upstream /scoreboard calls, shared by every viewer, depending on game state
+LIVE_INTERVAL = 15
+HALFTIME_INTERVAL = 60
+# Longest wait when nothing is live; a scheduled kickoff inside this window wakes the poller sooner
+IDLE_INTERVAL = 30 * 60
+# Stop polling when nobody has read the scoreboard for this long (seconds)
+IDLE_AFTER = 120
+
+# games: tuple of read-only game mappings; fetched: UTC datetime of the last good fetch;
+# interval: seconds until the poller fetches again; cards/html: rendered in-progress games
+# (see scoreboard_render.render_live_games), shared by every viewer
+Snapshot = namedtuple('Snapshot', ['games', 'fetched', 'error', 'interval', 'cards', 'html'])
+EMPTY_SNAPSHOT = Snapshot((), None, None, LIVE_INTERVAL, {}, '')
+
+_lock = threading.Lock()
+_snapshot = None
+_last_read = 0.0
+_thread = None
+_wake = threading.Event()
+_ready = threading.Event()
+
+
+def create_scoreboard(scoreboard):
+    return tuple(
+        MappingProxyType({
+            'home_id': game['homeTeam']['id'],
+            'away_id': game['awayTeam']['id'],
+            'home_team': game['homeTeam']['name'],
+            'away_team': game['awayTeam']['name'],
+            'status': game['status'],
+            'period': game['period'],
+            'clock': game['clock'],
+            'tv': game['tv'],
+            'situation': game['situation'],
+            'possession': game['possession'],
+            'home_team_score': game['homeTeam']['points'],
+            'away_team_score': game['awayTeam']['points'],
+            'spread': game['betting']['spread'],
+            'start_date': game.get('startDate'),
+        })
+        for game in scoreboard
+    )
+
+
+def clock_seconds(clock):
+    # Clocks come as 'MM:SS' or 'HH:MM:SS'
+    try:
+        seconds = 0
+        for part in str(clock).split(':'):
+            seconds = seconds * 60 + float(part)
+        return seconds
+    except ValueError:
+        return None
+
+
+def is_halftime(game):
+    return game['period'] == 2 and clock_seconds(game['clock']) == 0
+
+
+def next_interval(games, now):
+    """Fast while games are in progress, slower at halftime, and asleep until the next kickoff otherwise."""
+    live = [game for game in games if game['status'] == 'in_progress']
+    if live:
+        return HALFTIME_INTERVAL if all(is_halftime(game) for game in live) else LIVE_INTERVAL
+    kickoffs = [datetime.fromisoformat(game['start_date']) for game in games
+                if game['status'] == 'scheduled' and game['start_date']]
+    if kickoffs:
+        # A game past its kickoff that is not in progress yet is polled at the live cadence
+        wait = (min(kickoffs) - now).total_seconds()
+        return int(min(max(wait, LIVE_INTERVAL), IDLE_INTERVAL))
+    return IDLE_INTERVAL
+
+
+def poll_once():
+    global _snapshot
+    try:
+        games = create_scoreboard(get_json('/scoreboard', {'classification': 'fbs'}, cache=False))
+        now = datetime.now(timezone.utc)
+        # Only games whose score, clock, possession or situation moved are re-rendered
+        cards, html = render_live_games(games, (_snapshot or EMPTY_SNAPSHOT).cards)
+        snapshot = Snapshot(games, now, None, next_interval(games, now), cards, html)
+    except requests.exceptions.RequestException as e:
+        # Keep serving the last good games, but let viewers know the refresh failed
+        snapshot = (_snapshot or EMPTY_SNAPSHOT)._replace(error=str(e))
+    except Exception as e:
+        # A payload we could not read; same as above, so one bad game cannot stop the poller
+        snapshot = (_snapshot or EMPTY_SNAPSHOT)._replace(error=f'Unreadable scoreboard: {e!r}')
+    with _lock:
+        _snapshot = snapshot
+    _ready.set()
+
+
+def _poll_loop():
+    global _thread
+    try:
+        while True:
+            # Viewers re-read once per interval, so only call it idle after a couple of missed reads
+            idle_after = max(IDLE_AFTER, 2 * (_snapshot or EMPTY_SNAPSHOT).interval)
+            if time.time() - _last_read > idle_after:
+                # Nobody is watching: sleep until the next reader wakes us
+                _wake.clear()
+                if time.time() - _last_read > idle_after:
+                    _wake.wait()
+            poll_once()
+            time.sleep(_snapshot.interval)
+    finally:
+        # Should the loop ever die, never leave readers waiting, and let the next reader start a new one
+        _ready.set()
+        with _lock:
+            _thread = None
+
+
+def get_snapshot():
+    """Latest scoreboard snapshot, published by a single process-wide poller."""
+    global _last_read, _thread
+    with _lock:
+        _last_read = time.time()
+        if _thread is None:
+            _thread = threading.Thread(target=_poll_loop, name='scoreboard-poller', daemon=True)
+            _thread.start()
+    _wake.set()
+    # Only the very first reader has to wait for a fetch
+    _ready.wait(timeout=LIVE_INTERVAL)
+    with _lock:
+        return _snapshot or EMPTY_SNAPSHOT
@@ -0,0 +1,76 @@
+import metrics
+from team_directory import get_team_by_id
+
+# Height of one game card inside the scoreboard component (card + bottom margin)
+CARD_HEIGHT = 170
+# Game fields that show up on a card; a game is re-rendered only when one of them changes
+CARD_FIELDS = ['home_team', 'away_team', 'period', 'clock', 'tv', 'spread', 'situation', 'possession',
+               'home_team_score', 'away_team_score']
+
+
+def game_key(game):
+    return game['home_id'], game['away_id']
+
+
+def game_card(game):
+    home = get_team_by_id(game['home_id']) or {'logo': None, 'color': None}
+    away = get_team_by_id(game['away_id']) or {'logo': None, 'color': None}
+    away_color = away['color'] or "#ffffff"
+    home_color = home['color'] or "#ffffff"
+    return f"""
+        <div style="background: linear-gradient(to right, {away_color}50, {home_color}50);
+                    border-radius: 20px; padding: 20px; margin-bottom: 20px; font-family: 'Verdana', sans-serif;
+                    display: flex; justify-content: space-between; align-items: center; 
+                    text-align: center;
+                    width: 100%; max-width: 1200px; margin-left: auto; margin-right: auto; box-sizing: border-box;">
+
+            <div style="flex: 1; display: flex; flex-direction: column; align-items: center; justify-content: center;">
+                <div style="display: flex; align-items: center; margin-bottom: 5px;">
+                    <img src='{away['logo']}' width='50' style='margin-left: 10px;'>
+                    {" 🏈" if game['possession'] == 'away' else ""} 
+                </div>
+                <div style="font-size: 14px; font-weight: bold; margin-top: 0; overflow: hidden;
+                            text-overflow: ellipsis; white-space: nowrap; max-width: 250px;">{game['away_team']}</div>
+                <div style="font-size: 24px; font-weight: bold; margin-top: 0;">{int(game['away_team_score'])}</div>
+            </div>
+
+            <div style="flex: 1; text-align: center; display: flex; flex-direction: column; justify-content: center;">
+                <h4 style="font-family: 'Verdana', sans-serif; margin: 0;">{int(game['period'])}Q</h4>
+                <p style="margin: 0;">{game['clock']}</p>
+                <p style="margin: 0; font-size: 12px"><i>{f"{game['tv']} ▪️ {game['spread']}"}</i></p><br>
+                <p style="margin: 0;">{game['situation'] or "No situation available"}</p>
+            </div>
+
+            <div style="flex: 1; display: flex; flex-direction: column; align-items: center; justify-content: center;"> 
+                <div style="display: flex; align-items: center; margin-bottom: 5px;">
+                    <img src='{home['logo']}' width='50' style='margin-left: 10px;'>
+                    {" 🏈" if game['possession'] == 'home' else ""} 
+                </div>
+                <div style="font-size: 14px; font-weight: bold; margin-top: 0; overflow: hidden;
+                            text-overflow: ellipsis; white-space: nowrap; max-width: 250px;">{game['home_team']}</div>
+                <div style="font-size: 24px; font-weight: bold; margin-top: 0;">{int(game['home_team_score'])}</div>
+            </div>
+        </div>
+    """
+
+
+@metrics.timed
+def render_live_games(games, previous_cards):
+    """Render the in-progress games as one HTML document, reusing unchanged cards.
+
+    previous_cards maps game key -> (card fields, card html) from the last render. Returns the new
+    mapping and the document.
+    """
+    cards = {}
+    for game in games:
+        if game['status'] != 'in_progress':  # Only display in-progress games
+            continue
+        key = game_key(game)
+        fields = tuple(game[field] for field in CARD_FIELDS)
+        previous = previous_cards.get(key)
+        if previous is not None and previous[0] == fields:
+            cards[key] = previous
+        else:
+            cards[key] = (fields, game_card(game))
+    html = ''.join(card_html for fields, card_html in cards.values())
+    return cards, html
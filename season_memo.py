@@ -0,0 +1,45 @@
+import collections
+import os
+import threading
+import response_cache
+
+# Seasons kept in memory per store; the least recently used are dropped first
+MAX_SEASONS = int(os.environ.get('CFBD_MEMO_SEASONS', 8))
+
+
+def built_is_fresh(year, entry):
+    # Completed seasons never expire; the current one lasts as long as its cached responses
+    return response_cache.is_fresh(year, entry['built'])
+
+
+class SeasonMemo:
+    """Builds kept per key (a year, or a (year, week)), shared by every session in the process.
+
+    build(key, previous) makes an entry, given the stale one it replaces (or None); is_fresh(key, entry)
+    says whether an entry can still be served. At most max_entries are kept.
+    """
+
+    def __init__(self, build, is_fresh=built_is_fresh, max_entries=MAX_SEASONS):
+        self.build = build
+        self.is_fresh = is_fresh
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = collections.OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is None or not self.is_fresh(key, entry):
+            entry = self.build(key, entry)
+            with self._lock:
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
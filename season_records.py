@@ -0,0 +1,67 @@
+import time
+import pandas as pd
+import metrics
+from cfbd_client import get_json
+from season_memo import SeasonMemo
+
+# Flattened /records column -> column name used by the pages
+RECORD_COLUMNS = {
+    'team': 'team',
+    'conference': 'conference',
+    'total.games': 'Total Games',
+    'total.wins': 'Total Wins',
+    'total.losses': 'Total Losses',
+    'conferenceGames.games': 'Conference Games',
+    'conferenceGames.wins': 'Conference Wins',
+    'conferenceGames.losses': 'Conference Losses',
+    'homeGames.games': 'Home Games',
+    'homeGames.wins': 'Home Wins',
+    'homeGames.losses': 'Home Losses',
+    'awayGames.games': 'Away Games',
+    'awayGames.wins': 'Away Wins',
+    'awayGames.losses': 'Away Losses',
+    'expectedWins': 'Expected Wins',
+}
+
+@metrics.timed
+def create_season_records(records):
+    # Flatten the nested total/conferenceGames/homeGames/awayGames objects in one pass
+    records_df = pd.json_normalize(records) if records else pd.DataFrame()
+    records_df = records_df.reindex(columns=list(RECORD_COLUMNS)).rename(columns=RECORD_COLUMNS)
+    count_columns = [column for key, column in RECORD_COLUMNS.items() if '.' in key]
+    records_df[count_columns] = records_df[count_columns].fillna(0).astype(int)
+    return records_df
+
+
+def build_season(year):
+    records_df = create_season_records(get_json('/records', {'year': year}, stale_ok=False))
+    return {
+        'records': records_df,
+        'by_team': records_df.set_index('team', drop=False),
+        'by_conference': dict(tuple(records_df.groupby('conference'))),
+        'built': time.time(),
+    }
+
+
+_seasons = SeasonMemo(lambda year, previous: build_season(year))
+
+
+def get_season(year):
+    return _seasons.get(year)
+
+
+def get_season_records(year):
+    """Every team's record for a season, one row per team."""
+    return get_season(year)['records']
+
+
+def team_record(year, team):
+    by_team = get_season(year)['by_team']
+    if team not in by_team.index:
+        return by_team.iloc[0:0].reset_index(drop=True)
+    return by_team.loc[[team]].reset_index(drop=True)
+
+
+def conference_records(year, conference):
+    season = get_season(year)
+    return season['by_conference'].get(conference, season['records'].iloc[0:0])
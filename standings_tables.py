@@ -0,0 +1,105 @@
+import metrics
+import season_records
+from html_templates import render_template
+from season_memo import SeasonMemo
+from team_directory import team_attribute
+
+STANDINGS_HEAD = """
+        <style>
+        .scrollable-table {
+            max-height: 825px; /* Adjust as needed */
+            overflow-y: auto;
+        }
+        table {
+            margin: 0;
+            padding: 0;
+            font-family: 'Arial', sans-serif; 
+            font-size: 14px;
+        }
+        th, td {
+            padding: 8px;
+        }
+        /* Target <th> in the second <tr> within <thead> */
+        thead > tr:nth-child(2) > th { 
+            width: 5%; /* Adjust this value as needed */
+        }
+        /* Target the first column (td) in each row */
+        td:first-child { 
+        width: 20%; /* Adjust this value as needed */
+        }
+        </style>
+        <div class="scrollable-table">
+        <table style="border: 1px solid black; border-collapse: collapse; width: 100%; text-align: center;">
+            <thead>
+                <tr style="background-color: #e0e0e0;">
+                    <th rowspan="2" style="border: 1px solid black;">Team</th>
+                    <th colspan="3" style="border: 1px solid black;">Totals</th>
+                    <th colspan="3" style="border: 1px solid black;">Conference</th>
+                    <th colspan="3" style="border: 1px solid black;">Home</th>
+                    <th colspan="3" style="border: 1px solid black;">Away</th>
+                </tr>
+                <tr style="background-color: #f2f2f2;">
+                    <th style="border: 1px solid black;">G</th>
+                    <th style="border: 1px solid black;">W</th>
+                    <th style="border: 1px solid black;">L</th>
+                    <th style="border: 1px solid black;">G</th>
+                    <th style="border: 1px solid black;">W</th>
+                    <th style="border: 1px solid black;">L</th>
+                    <th style="border: 1px solid black;">G</th>
+                    <th style="border: 1px solid black;">W</th>
+                    <th style="border: 1px solid black;">L</th>
+                    <th style="border: 1px solid black;">G</th>
+                    <th style="border: 1px solid black;">W</th>
+                    <th style="border: 1px solid black;">L</th>
+                </tr>
+            </thead>
+            <tbody>
+        """
+STANDINGS_ROW = """
+        <tr>
+            <td style="border: 1px solid black; text-align: left; padding: 5px;">
+                <img src="{Team Logo}" width="30" style="vertical-align: middle; margin-right: 10px;">
+                {team}
+            </td>
+            <td style="border: 1px solid black;">{Total Games}</td>
+            <td style="border: 1px solid black;">{Total Wins}</td>
+            <td style="border: 1px solid black;">{Total Losses}</td>
+            <td style="border: 1px solid black;">{Conference Games}</td>
+            <td style="border: 1px solid black;">{Conference Wins}</td>
+            <td style="border: 1px solid black;">{Conference Losses}</td>
+            <td style="border: 1px solid black;">{Home Games}</td>
+            <td style="border: 1px solid black;">{Home Wins}</td>
+            <td style="border: 1px solid black;">{Home Losses}</td>
+            <td style="border: 1px solid black;">{Away Games}</td>
+            <td style="border: 1px solid black;">{Away Wins}</td>
+            <td style="border: 1px solid black;">{Away Losses}</td>
+        </tr>
+        """
+STANDINGS_TAIL = "</tbody></table></div>"
+
+@metrics.timed
+def build_tables(records):
+    """Standings HTML for every conference in a season's records, from one sort and one templated pass."""
+    records = records.assign(**{'Team Logo': team_attribute(records['team'], 'logo')})
+    records = records.sort_values(by=['Total Wins', 'Conference Wins'], ascending=False, kind='stable')
+    rows = render_template(STANDINGS_ROW, records)
+    return {conference: STANDINGS_HEAD + ''.join(conference_rows) + STANDINGS_TAIL
+            for conference, conference_rows in rows.groupby(records['conference'], sort=False)}
+
+
+def build_season(year, previous=None):
+    season = season_records.get_season(year)
+    return {'html': build_tables(season['records']), 'built': season['built']}
+
+
+# Rebuilt only when season_records rebuilds the season they come from
+_tables = SeasonMemo(build_season, lambda year, tables: tables['built'] == season_records.get_season(year)['built'])
+
+
+def get_tables(year):
+    return _tables.get(year)['html']
+
+
+def standings_html(year, conference):
+    """The standings table for one conference, or None if it has no teams that season."""
+    return get_tables(year).get(conference)
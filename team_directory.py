@@ -0,0 +1,147 @@
+import json
+import logging
+import os
+import threading
+import time
+import requests
+from atomic_files import atomic_write_json
+from cfbd_client import get_json
+
+TEAM_INFO_PATH = 'team_info.json'
+# How often (seconds) the background thread re-pulls /teams
+REFRESH_INTERVAL = int(os.environ.get('CFBD_TEAMS_REFRESH', 24 * 60 * 60))
+
+# Which entry wins when a school name appears more than once (e.g. the two Charlotte rows)
+CLASSIFICATION_RANK = {'fbs': 0, 'fcs': 1, 'ii': 2, 'iii': 3}
+
+_lock = threading.Lock()
+_teams = None
+_index = None
+_refresher = None
+logger = logging.getLogger(__name__)
+
+
+def load_teams():
+    try:
+        with open(TEAM_INFO_PATH, 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def write_teams(teams):
+    """Atomically replace team_info.json, but only if its contents actually changed."""
+    contents = json.dumps(teams)
+    try:
+        with open(TEAM_INFO_PATH, 'r', encoding='utf-8') as file:
+            if file.read() == contents:
+                return False
+    except OSError:
+        pass
+    atomic_write_json(TEAM_INFO_PATH, teams)
+    return True
+
+
+def refresh():
+    global _teams, _index
+    teams = get_json('/teams', cache=False)
+    if not teams:
+        # Never replace a good list with an empty one
+        raise ValueError('Empty /teams response')
+    if write_teams(teams) or _teams is None:
+        with _lock:
+            _teams = teams
+            _index = None
+
+
+def _refresh_loop():
+    # Refresh once at startup (the shipped team_info.json may be old and instances are short-lived),
+    # then on schedule
+    while True:
+        try:
+            refresh()
+        except requests.exceptions.RequestException as e:
+            # Keep serving the current list; try again next interval
+            logger.warning('Team list refresh failed: %s', e)
+        except Exception:
+            # Same for a bad payload or an unwritable team_info.json, which must not end the thread
+            logger.exception('Team list refresh failed')
+        time.sleep(REFRESH_INTERVAL)
+
+
+def get_teams():
+    """Return the team list, loaded once per process and kept fresh in the background."""
+    global _teams, _refresher
+    with _lock:
+        if _teams is None:
+            _teams = load_teams()
+        if _refresher is None:
+            _refresher = threading.Thread(target=_refresh_loop, name='team-directory-refresh', daemon=True)
+            _refresher.start()
+        teams = _teams
+    if teams is None:
+        # No usable file on disk yet, fetch synchronously once
+        refresh()
+        teams = _teams
+    return teams
+
+
+def team_entry(team):
+    logos = team.get('logos') or []
+    return {
+        'id': team['id'],
+        'school': team['school'],
+        'color': team.get('color'),
+        'logo': logos[0].replace('http://', 'https://') if logos else None,
+        'mascot': team.get('mascot'),
+        'conference': team.get('conference'),
+        'classification': team.get('classification'),
+    }
+
+
+def build_index(teams):
+    by_school = {}
+    by_id = {}
+    for team in teams:
+        entry = team_entry(team)
+        by_id[entry['id']] = entry
+        current = by_school.get(entry['school'])
+        if current is None or (CLASSIFICATION_RANK.get(entry['classification'], 4)
+                               < CLASSIFICATION_RANK.get(current['classification'], 4)):
+            by_school[entry['school']] = entry
+    return {
+        'by_school': by_school,
+        'by_id': by_id,
+        'fbs': sorted(school for school, entry in by_school.items() if entry['classification'] == 'fbs'),
+        'fbs_fcs': sorted(school for school, entry in by_school.items() if entry['classification'] in ('fbs', 'fcs')),
+    }
+
+
+def get_index():
+    """Hash indexes over the team list, built once per team list."""
+    global _index
+    get_teams()
+    with _lock:
+        if _index is None:
+            _index = build_index(_teams)
+        return _index
+
+
+def get_team(school):
+    """Return color, https logo, mascot, conference and classification for a school, or None."""
+    return get_index()['by_school'].get(school)
+
+
+def get_team_by_id(team_id):
+    return get_index()['by_id'].get(team_id)
+
+
+def team_names(include_fcs=True):
+    """Sorted school names for the team selectors."""
+    return get_index()['fbs_fcs' if include_fcs else 'fbs']
+
+
+def team_attribute(keys, attribute, by='school'):
+    """Map a Series of school names (or team ids with by='id') to one directory attribute."""
+    index = get_index()['by_school' if by == 'school' else 'by_id']
+    return keys.map(lambda key: index[key][attribute] if key in index else None)
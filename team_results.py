@@ -1,10 +1,17 @@
-import json
+import time
 from datetime import datetime
 import cfbd
 import pandas as pd
 import requests
 import streamlit as st
-from config_api import configuration, headers
+import metrics
+import response_cache
+from cfbd_client import fetch_concurrently, submit
+from season_records import team_record
+from box_scores import create_box_score_index, create_player_stats, get_box_score
+from team_directory import get_team, team_names
+
+metrics.rerun_started('team_results')
 
 # Initialize global variables
 
@@ -20,132 +27,41 @@ st.session_state.team = ''
 st.sidebar.title("CFB Data")
 
 
-def is_number(s):
-    """Helper function to check if a value can be converted to a float."""
-    try:
-        float(s)
-        return True
-    except ValueError:
-        return False
-
-
 def get_cfbd_data(year, team):
-    with cfbd.ApiClient(configuration) as api_client:
-        games_api = cfbd.GamesApi(api_client)
-        coaches_api = cfbd.CoachesApi(api_client)
-        teams_api = cfbd.TeamsApi(api_client)
-        team_info = teams_api.get_teams()
-        with open('team_info.json', 'w', encoding='utf-8') as json_file:
-            json.dump([team.to_dict() for team in team_info], json_file)
-        games = games_api.get_games(year=year, team=team)
-        games_data = games_api.get_game_player_stats(year=year, team=team)
-        teams_data = games_api.get_game_team_stats(year=year, team=team)
-        games_df = pd.DataFrame([game.to_dict() for game in games])
-        coach_data = coaches_api.get_coaches(year=year, team=team)
-        return games_df, games_data, team_info, teams_data, coach_data
+    query = {'year': year, 'team': team}
+    # The calls are independent, so send them together: a cold load waits for the slowest call, not the sum
+    futures = fetch_concurrently({
+        'games': ('/games', query),
+        'players': ('/games/players', query),
+        'teams': ('/games/teams', query),
+        'coaches': ('/coaches', query),
+    })
+    # The record is a slice of the shared season records table
+    records_future = submit(team_record, year, team)
+    results = {name: futures[name].result() for name in ['games', 'players', 'teams', 'coaches']}
+    games_df = pd.DataFrame(results['games'])
+    games_data = results['players']
+    teams_data = [cfbd.GameTeamStats.from_dict(game) for game in results['teams']]
+    coach_data = [cfbd.Coach.from_dict(coach) for coach in results['coaches']]
+    return games_df, games_data, teams_data, coach_data, records_future
 
 
 def team_information():
-    with open('team_info.json', 'r') as file:
-        data_dict = json.load(file)
-    team_df = pd.DataFrame(data_dict)
-    for school in team_df['school']:
-        if school == team:
-            # set team_color = color for school = team
-            team_color = team_df[team_df['school'] == team]['color'].values[0]
-            team_logo = team_df[team_df['school'] == team]['logos'].values[0][0]
-            team_logo = team_logo.replace('http://', 'https://')
-            team_mascot = team_df[team_df['school'] == team]['mascot'].values[0]
-            team_conference = team_df[team_df['school'] == team]['conference'].values[0]
-            return team_color, team_logo, team_mascot, team_conference
-
-
-def get_team_records():
-    # Make the API request
-    url = f'https://api.collegefootballdata.com/records?year={year}&team={team}'
-    response = requests.get(url, headers=headers)
-
-    # Check if the request was successful
-    if response.status_code == 200:
-        team_records = response.json()  # Get the raw JSON response
-        return team_records
-    else:
-        st.write(f"Failed to fetch data. Status code: {response.status_code}")
-        return None
-
-
-def create_team_records(valid_records):
-    if not valid_records:
-        return pd.DataFrame()  # Return an empty DataFrame if no valid records
-
-    team_records_list = []
-
-    for record in valid_records:
-        team_record = {
-            'Total Games': record['total'].get('games', 0),
-            'Total Wins': record['total'].get('wins', 0),
-            'Total Losses': record['total'].get('losses', 0),
-            'Conference Games': record['conferenceGames'].get('games', 0),
-            'Conference Wins': record['conferenceGames'].get('wins', 0),
-            'Conference Losses': record['conferenceGames'].get('losses', 0),
-            'Home Games': record['homeGames'].get('games', 0),
-            'Home Wins': record['homeGames'].get('wins', 0),
-            'Home Losses': record['homeGames'].get('losses', 0),
-            'Away Games': record['awayGames'].get('games', 0),
-            'Away Wins': record['awayGames'].get('wins', 0),
-            'Away Losses': record['awayGames'].get('losses', 0),
-            'Expected Wins': record.get('expectedWins', "N/A")
-        }
+    team_info = get_team(team)
+    if team_info:
+        return team_info['color'], team_info['logo'], team_info['mascot'], team_info['conference']
 
-        team_records_list.append(team_record)
-
-    team_record_df = pd.DataFrame(team_records_list)
-
-    return team_record_df
-
-
-def create_player_stats(games_data):
-    # Create a list to store the extracted data
-    game_stats = []
-
-    # Loop through each game
-    for game in games_data:
-        game_id = game.id
 
-        # Loop through each team in the game
-        for team in game.teams:
-            team_name = team.team
-
-            # Loop through each category and extract statistics
-            for category in team.categories:
-                category_name = category.name
-
-                # For each type inside the category
-                for stat_type in category.types:
-                    stat_name = stat_type.name
-
-                    # Extract the statistics of athletes
-                    for athlete in stat_type.athletes:
-                        athlete_id = athlete.id
-                        athlete_name = athlete.name
-                        stat_value = athlete.stat
-
-                        # Append the data to the list
-                        game_stats.append({
-                            'game_id': game_id,
-                            'team': team_name,
-                            'category': category_name,
-                            'stat_name': stat_name,
-                            'athlete_id': athlete_id,
-                            'athlete_name': athlete_name,
-                            'stat_value': stat_value
-                        })
-
-    # Convert the list to a pandas DataFrame
-    stats_df = pd.DataFrame(game_stats)
-    return stats_df
+def get_team_records(records_future):
+    # Wait for the request dispatched alongside the season fetch; None if it failed
+    try:
+        return records_future.result()
+    except requests.exceptions.RequestException as e:
+        st.write(f"Failed to fetch data: {e}")
+        return None
 
 
+@metrics.timed
 def create_team_stats(teams_data):
     # Create a list to store the extracted data
     team_stats = []
@@ -178,7 +94,8 @@ def create_team_stats(teams_data):
                 })
 
     # Convert the list to a pandas DataFrame
-    team_stats_df = pd.DataFrame(team_stats)
+    team_stats_df = pd.DataFrame(team_stats, columns=['game_id', 'team_id', 'team', 'conference', 'points',
+                                                      'category', 'stat_value'])
     team_stats_df = team_stats_df.sort_values('category', ascending=True)
     return team_stats_df
 
@@ -205,6 +122,8 @@ def highlight_scores(row):
     return [home_color, away_color]
 
 
+# Runs as a fragment: a row click reruns only this function against the season already loaded
+@st.fragment
 def display_results(games_df):# Display results for each game
     games_columns = {
         'week': 'Week',
@@ -218,6 +137,7 @@ def display_results(games_df):# Display results for each game
         'attendance': 'Attendance',
     }
     st.markdown("Select a game for game statistics")
+    games_df = games_df.copy()
     games_df['startDate'] = pd.to_datetime(games_df['startDate']).dt.strftime('%b %d, %Y')
     games_df['homePoints'] = games_df['homePoints'].fillna(0)
     games_df['awayPoints'] = games_df['awayPoints'].fillna(0)
@@ -235,74 +155,53 @@ def display_results(games_df):# Display results for each game
     selected_game = games_df.iloc[games_played.selection.rows]
 
     if not selected_game.empty and year >= 2004:
-        team_game_stats_df = team_stats_df[team_stats_df['game_id'].values == selected_game['id'].values[0]]
-        gt_team_stats_df = team_game_stats_df[team_game_stats_df['team'] == team]
-        other_team_stats_df = team_game_stats_df[team_game_stats_df['team'] != team]
-        players_stats_df = stats_df[stats_df['game_id'].values == selected_game['id'].values[0]]
-        gt_stats_df = players_stats_df[players_stats_df['team'] == team]
-        other_stats_df = players_stats_df[players_stats_df['team'] != team]
-
-        # Convert 'stat_value' where the values can be converted to numeric, leave others unchanged
-        gt_stats_df.loc[:, 'stat_value'] = gt_stats_df['stat_value'].apply(lambda x: float(x) if is_number(x) else x)
-        other_stats_df.loc[:, 'stat_value'] = other_stats_df['stat_value'].apply(
-            lambda x: float(x) if is_number(x) else x)
-        # Get unique categories dynamically from the 'category' field
-        gt_categories = sorted(gt_stats_df['category'].unique())
-        other_categories = sorted(other_stats_df['category'].unique())
-
+        box_score = get_box_score(box_score_index, selected_game['id'].values[0], team)
         col1, col2 = st.columns(2)
-
-        with col1:
-            st.header(team)
-            st.markdown('#### Team Statistics')
-            st.dataframe(gt_team_stats_df[['category', 'stat_value']],
-                         use_container_width=True,
-                         hide_index=True)
-
-            # Display pivot tables for each unique category
-            for category in gt_categories:
-                st.markdown(f'#### {category.capitalize()} Statistics')
-                filtered_gt_stats = gt_stats_df[gt_stats_df['category'] == category]
-                if not filtered_gt_stats.empty:
-                    gt_pivot = pd.pivot_table(filtered_gt_stats, values='stat_value', index='athlete_name',
-                                              columns='stat_name', aggfunc='sum')
-                    st.dataframe(gt_pivot, use_container_width=True)
-                else:
-                    st.write(f"No data available for {category.capitalize()}")
-
-        with col2:
-            other_team = other_stats_df['team'].unique()[0] if not other_stats_df.empty else 'Opponent'
-            st.header(other_team)
-            st.markdown('#### Team Statistics')
-            st.dataframe(other_team_stats_df[['category', 'stat_value']],
-                         use_container_width=True,
-                         hide_index=True)
-
-            # Display pivot tables for each unique category for the other team
-            for category in other_categories:
-                st.markdown(f'#### {category.capitalize()} Statistics')
-                filtered_other_stats = other_stats_df[other_stats_df['category'] == category]
-                if not filtered_other_stats.empty:
-                    other_pivot = pd.pivot_table(filtered_other_stats, values='stat_value', index='athlete_name',
-                                                 columns='stat_name', aggfunc='sum')
-                    st.dataframe(other_pivot, use_container_width=True)
-                else:
-                    st.write(f"No data available for {category.capitalize()}")
+        for column, side in ((col1, box_score['team']), (col2, box_score['opponent'])):
+            with column:
+                st.header(side['name'])
+                st.markdown('#### Team Statistics')
+                st.dataframe(side['team_stats'],
+                             use_container_width=True,
+                             hide_index=True)
+
+                # Display pivot tables for each unique category
+                for category, pivot in side['categories']:
+                    st.markdown(f'#### {category.capitalize()} Statistics')
+                    st.dataframe(pivot, use_container_width=True)
     else:
         st.write("No statistics available")
 
 
+def load_season(year, team):
+    # Fetch and flatten a team's season once; reruns and game clicks reuse it while it is fresh
+    # A season missing its record is shown but rebuilt on the next rerun
+    season = st.session_state.get('season')
+    if season is None or season['key'] != (year, team) or not season['complete'] \
+            or not response_cache.is_fresh(year, season['built']):
+        games_df, games_data, teams_data, coach_data, records_future = get_cfbd_data(year, team)
+        team_records_df = get_team_records(records_future)
+        season = {
+            'key': (year, team),
+            'built': time.time(),
+            'complete': team_records_df is not None,
+            'games_df': games_df,
+            'team_records_df': team_records_df if team_records_df is not None else pd.DataFrame(),
+            'box_score_index': create_box_score_index(create_player_stats(games_data), create_team_stats(teams_data)),
+            'coach_name': create_coach(coach_data),
+        }
+        st.session_state.season = season
+    return season
+
+
 def select_team_year():
     year = st.sidebar.number_input('Enter Year',
                                    min_value=1902,
                                    max_value=datetime.now().year,
                                    step=1,
                                    value=2024)
-    # Load the JSON data from the uploaded file
-    with open('team_info.json') as f:
-        team_data = json.load(f)
-    # Filter teams with classification "fbs" or "fcs"
-    filtered_teams = sorted([team['school'] for team in team_data if team['classification'] in ['fbs', 'fcs']])
+    # Team names with classification "fbs" or "fcs"
+    filtered_teams = team_names(include_fcs=True)
     if st.session_state.team != '':
         team_index = filtered_teams.index(st.session_state.team)
     else:
@@ -314,7 +213,7 @@ def select_team_year():
 
 
 team, year = select_team_year()
-games_df, games_data, team_info, teams_data, coach_data = get_cfbd_data(year, team)
+season = load_season(year, team)
 team_color, team_logo, team_mascot, team_conference = team_information()
 st.markdown(f"""
     <div style='display: flex; align-items: center;'>
@@ -327,11 +226,9 @@ st.markdown(f"""
 
     """, unsafe_allow_html=True)
 st.sidebar.markdown('Statistics per Game available 2004 and later')
-team_records = get_team_records()
-team_records_df = create_team_records(team_records)
-stats_df = create_player_stats(games_data)
-team_stats_df = create_team_stats(teams_data)
-coach_name = create_coach(coach_data)
+team_records_df = season['team_records_df']
+box_score_index = season['box_score_index']
+coach_name = season['coach_name']
 if len(team_records_df) == 1:
     st.markdown(f"##### Overall: {int(team_records_df['Total Wins'].iloc[0])} - {int(team_records_df['Total Losses'].iloc[0])}, "
                 f"Conference ({team_conference}): {int(team_records_df['Conference Wins'].iloc[0])} - {int(team_records_df['Conference Losses'].iloc[0])}, "
@@ -339,7 +236,5 @@ if len(team_records_df) == 1:
                 f"Away: {int(team_records_df['Away Wins'].iloc[0])} - {int(team_records_df['Away Losses'].iloc[0])}, "
                 f"Coach: {coach_name}"
                 )
-display_results(games_df)
-
-
-
+display_results(season['games_df'])
+metrics.rerun_finished()
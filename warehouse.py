@@ -0,0 +1,313 @@
+"""Local store of completed seasons, so historical pages never wait on (or depend on) the API.
+
+Ingest seasons with:
+    python warehouse.py 2014 2023
+
+Every response is stored once, zlib-compressed, keyed by its request and indexed by endpoint,
+year, week and team. The records of season-wide and weekly responses are also stored one row
+each, indexed by team, week and game id. get_json answers requests for completed seasons from
+here first. A request that was not stored as such (e.g. /games?year=2019&team=Georgia Tech) is
+answered from the matching record rows, as long as every week of a weekly endpoint was ingested;
+otherwise it goes to the API. Answers are memoized in memory.
+"""
+import argparse
+import collections
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+import requests
+from response_cache import cache_key, current_season
+
+WAREHOUSE_PATH = os.environ.get('CFBD_WAREHOUSE', '.cache/warehouse.sqlite')
+
+# Query parameters that can be answered by filtering a broader stored response
+FILTER_PARAMS = ('week', 'team', 'college')
+# Fields that name a team, across endpoints
+TEAM_FIELDS = ('team', 'school', 'homeTeam', 'awayTeam', 'home_team', 'away_team', 'committedTo', 'collegeTeam')
+
+# Season-wide requests stored per completed season (the pages' per-team/per-week queries are derived from these)
+SEASON_REQUESTS = [
+    ('/calendar', {}),
+    ('/games', {}),
+    ('/games', {'division': 'fbs'}),
+    ('/lines', {}),
+    ('/games/media', {}),
+    ('/records', {}),
+    ('/rankings', {}),
+    ('/coaches', {}),
+    ('/roster', {}),
+    ('/recruiting/players', {}),
+    ('/recruiting/teams', {}),
+    ('/player/portal', {}),
+    ('/draft/picks', {}),
+    ('/stats/season', {}),
+    ('/stats/player/season', {}),
+    ('/ratings/fpi', {}),
+    ('/ratings/elo', {}),
+    ('/ratings/srs', {}),
+    ('/ratings/sp', {}),
+]
+# Game stats can only be pulled a week at a time
+WEEKLY_REQUESTS = ['/games/players', '/games/teams']
+# Answers kept in memory, least recently used out first once they hold this many records in total
+MEMO_RECORDS = int(os.environ.get('CFBD_WAREHOUSE_MEMO_RECORDS', 200000))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    request_key TEXT PRIMARY KEY,
+    base_key TEXT NOT NULL,
+    endpoint TEXT NOT NULL,
+    year INTEGER,
+    week INTEGER,
+    team TEXT,
+    payload BLOB NOT NULL,
+    ingested REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_base ON responses (base_key, week, team);
+CREATE INDEX IF NOT EXISTS responses_year ON responses (endpoint, year, team);
+CREATE TABLE IF NOT EXISTS records (
+    request_key TEXT NOT NULL,
+    base_key TEXT NOT NULL,
+    year INTEGER,
+    week INTEGER,
+    game_id INTEGER,
+    record TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS records_request ON records (request_key);
+CREATE INDEX IF NOT EXISTS records_base ON records (base_key, week);
+CREATE TABLE IF NOT EXISTS record_teams (
+    record INTEGER NOT NULL,
+    base_key TEXT NOT NULL,
+    year INTEGER,
+    team TEXT NOT NULL,
+    week INTEGER,
+    game_id INTEGER
+);
+CREATE INDEX IF NOT EXISTS record_teams_base ON record_teams (base_key, team, week);
+CREATE INDEX IF NOT EXISTS record_teams_game ON record_teams (year, team, game_id);
+-- Regular-season weeks of a season, so stitched weekly answers are only given when complete
+CREATE TABLE IF NOT EXISTS season_weeks (
+    year INTEGER PRIMARY KEY,
+    weeks TEXT NOT NULL
+);
+"""
+
+_local = threading.local()
+_memo = collections.OrderedDict()
+_memo_records = 0
+_memo_lock = threading.Lock()
+
+
+def base_params(params):
+    return {key: value for key, value in (params or {}).items() if key not in FILTER_PARAMS}
+
+
+def connect(readonly=True):
+    if readonly:
+        return sqlite3.connect(f'file:{WAREHOUSE_PATH}?mode=ro', uri=True)
+    os.makedirs(os.path.dirname(WAREHOUSE_PATH) or '.', exist_ok=True)
+    connection = sqlite3.connect(WAREHOUSE_PATH)
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def reader():
+    # One read-only connection per thread; None until a warehouse has been ingested
+    if getattr(_local, 'path', None) != WAREHOUSE_PATH:
+        _local.connection = connect() if os.path.exists(WAREHOUSE_PATH) else None
+        _local.path = WAREHOUSE_PATH if _local.connection is not None else None
+    return _local.connection
+
+
+def decode(blob):
+    return json.loads(zlib.decompress(blob))
+
+
+def record_teams(record):
+    """Every team a record names: its team fields, both sides of game stats, a coach's schools."""
+    teams = {record.get(field) for field in TEAM_FIELDS}
+    teams.update(side.get('team') for side in record.get('teams') or [])
+    teams.update(season.get('school') for season in record.get('seasons') or [])
+    return {team for team in teams if isinstance(team, str)}
+
+
+def memoized(key):
+    with _memo_lock:
+        if key in _memo:
+            _memo.move_to_end(key)
+            return _memo[key]
+    return None
+
+
+def memo_size(payload):
+    return len(payload) if isinstance(payload, list) else 1
+
+
+def memoize(key, payload):
+    global _memo_records
+    with _memo_lock:
+        if key in _memo:
+            _memo_records -= memo_size(_memo.pop(key))
+        _memo[key] = payload
+        _memo_records += memo_size(payload)
+        while _memo_records > MEMO_RECORDS and len(_memo) > 1:
+            _memo_records -= memo_size(_memo.popitem(last=False)[1])
+
+
+def sources(connection, endpoint, params):
+    """Request keys of the stored responses a filtered request can be answered from, or None.
+
+    The season-wide response if there is one; otherwise the weekly responses, but only when every
+    week asked for (all of the season's regular weeks, unless a week is given) was ingested.
+    """
+    base_key = cache_key(endpoint, base_params(params))
+    stored = connection.execute('SELECT request_key, week FROM responses WHERE base_key = ? AND team IS NULL',
+                                (base_key,)).fetchall()
+    season_wide = [key for key, week in stored if week is None]
+    if season_wide:
+        return season_wide[:1]
+    weekly = {week: key for key, week in stored}
+    if 'week' in params:
+        wanted = [int(params['week'])]
+    else:
+        row = connection.execute('SELECT weeks FROM season_weeks WHERE year = ?', (params.get('year'),)).fetchone()
+        if row is None:
+            return None
+        wanted = json.loads(row[0])
+    if not wanted or any(week not in weekly for week in wanted):
+        return None
+    return [weekly[week] for week in wanted]
+
+
+def derive(connection, endpoint, params):
+    # Only the matching record rows are read and decoded
+    keys = sources(connection, endpoint, params)
+    if keys is None:
+        return None
+    team = params.get('team', params.get('college'))
+    marks = ', '.join('?' * len(keys))
+    if team is not None:
+        query = (f'SELECT r.record FROM record_teams t JOIN records r ON r.rowid = t.record '
+                 f'WHERE t.base_key = ? AND t.team = ? AND r.request_key IN ({marks})')
+        args = [cache_key(endpoint, base_params(params)), team, *keys]
+        week_column = 't.week'
+    else:
+        query = f'SELECT r.record FROM records r WHERE r.request_key IN ({marks})'
+        args = list(keys)
+        week_column = 'r.week'
+    if 'week' in params:
+        query += f' AND ({week_column} IS NULL OR {week_column} = ?)'
+        args.append(int(params['week']))
+    rows = connection.execute(query + ' ORDER BY r.rowid', args).fetchall()
+    return [json.loads(record) for record, in rows]
+
+
+def get(endpoint, params=None):
+    """The stored payload for a request, derived from a broader stored response if needed, or None."""
+    connection = reader()
+    if connection is None:
+        return None
+    params = params or {}
+    key = cache_key(endpoint, params)
+    payload = memoized(key)
+    if payload is not None:
+        return payload
+    try:
+        row = connection.execute('SELECT payload FROM responses WHERE request_key = ?', (key,)).fetchone()
+        if row is not None:
+            payload = decode(row[0])
+        elif any(param in params for param in FILTER_PARAMS):
+            payload = derive(connection, endpoint, params)
+    except sqlite3.Error:
+        return None
+    if payload is not None:
+        memoize(key, payload)
+    return payload
+
+
+def put_records(connection, request_key, endpoint, params, payload):
+    # One row per record, plus one per team it names, for the filtered requests derived from it
+    base_key = cache_key(endpoint, base_params(params))
+    year = params.get('year')
+    connection.execute('DELETE FROM record_teams WHERE record IN (SELECT rowid FROM records WHERE request_key = ?)',
+                       (request_key,))
+    connection.execute('DELETE FROM records WHERE request_key = ?', (request_key,))
+    for record in payload if isinstance(payload, list) else []:
+        if not isinstance(record, dict):
+            continue
+        week = record.get('week', params.get('week'))
+        game_id = record.get('id') if endpoint.startswith('/games') else record.get('gameId')
+        cursor = connection.execute('INSERT INTO records VALUES (?, ?, ?, ?, ?, ?)',
+                                    (request_key, base_key, year, week, game_id, json.dumps(record)))
+        connection.executemany('INSERT INTO record_teams VALUES (?, ?, ?, ?, ?, ?)',
+                               [(cursor.lastrowid, base_key, year, team, week, game_id) for team in record_teams(record)])
+
+
+def put(connection, endpoint, params, payload):
+    request_key = cache_key(endpoint, params)
+    connection.execute(
+        'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+        (request_key, cache_key(endpoint, base_params(params)), endpoint, params.get('year'),
+         params.get('week'), params.get('team'), zlib.compress(json.dumps(payload).encode('utf-8')), time.time()))
+    if params.get('team') is None:
+        put_records(connection, request_key, endpoint, params, payload)
+
+
+def index_stored(connection):
+    """Add record rows for responses stored before record rows existed."""
+    rows = connection.execute('SELECT request_key, endpoint, year, week, payload FROM responses '
+                              'WHERE team IS NULL AND request_key NOT IN (SELECT request_key FROM records)').fetchall()
+    for request_key, endpoint, year, week, blob in rows:
+        params = {'year': year} if week is None else {'year': year, 'week': week}
+        put_records(connection, request_key, endpoint, params, decode(blob))
+    connection.commit()
+
+
+def season_requests(year, weeks):
+    calls = [(endpoint, dict(params, year=year)) for endpoint, params in SEASON_REQUESTS]
+    calls += [(endpoint, {'year': year, 'week': week}) for endpoint in WEEKLY_REQUESTS for week in weeks]
+    return calls
+
+
+def ingest(years):
+    """Download every completed season in `years` into the warehouse; already stored requests are skipped."""
+    from cfbd_client import executor, get_json
+
+    connection = connect(readonly=False)
+    index_stored(connection)
+    stored = {key for key, in connection.execute('SELECT request_key FROM responses')}
+    for year in years:
+        if year >= current_season():
+            print(f'{year}: skipped, season not complete')
+            continue
+        calendar = get_json('/calendar', {'year': year}, cache=False)
+        weeks = sorted({entry['week'] for entry in calendar if entry.get('seasonType', 'regular') == 'regular'})
+        connection.execute('INSERT OR REPLACE INTO season_weeks VALUES (?, ?)', (year, json.dumps(weeks)))
+        pending = [(endpoint, params) for endpoint, params in season_requests(year, weeks)
+                   if cache_key(endpoint, params) not in stored]
+        futures = [(endpoint, params, executor.submit(get_json, endpoint, params, False)) for endpoint, params in pending]
+        failed = 0
+        for endpoint, params, future in futures:
+            try:
+                put(connection, endpoint, params, future.result())
+            except requests.exceptions.RequestException as e:
+                failed += 1
+                print(f'{year}: {endpoint} {params} failed: {e}')
+        connection.commit()
+        print(f'{year}: {len(pending) - failed} requests stored, {failed} failed')
+    connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('first_year', type=int)
+    parser.add_argument('last_year', type=int, nargs='?')
+    args = parser.parse_args()
+    ingest(range(args.first_year, (args.last_year or args.first_year) + 1))
+
+
+if __name__ == '__main__':
+    main()